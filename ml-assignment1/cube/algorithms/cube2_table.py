@@ -0,0 +1,162 @@
+"""Complete distance table for the 2x2x2 cube.
+
+A 2x2x2 has no fixed centres, so every position is normalised by the
+whole-cube rotation that brings the D-B-L corner piece home untwisted.
+The other seven corners then give a compact index: their permutation of the
+remaining slots (7! ranks) times the twists of the first six (3**6; the
+last twist follows from the others). That makes 3,674,160 positions. A BFS
+from solved with the R, U and F turns (the faces that leave D-B-L alone)
+fills in every distance once. The table is stored with 4 bits per entry
+and memory-mapped afterwards.
+
+Solving then needs no search. From any position, one of the 18 face turns
+leads to a position one step closer, so an optimal solution is read off the
+table one lookup at a time. The same table checks the other solvers'
+solution lengths.
+"""
+import logging
+import mmap
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cube import cube_to_state, cube_rotations, face_turns
+from algorithms.patterndb import TABLE_DIR, UNKNOWN, CornerModel, permutation_ranks, twist_ranks, write_table
+from algorithms.cubesolver import MemorySampler, _search_stats
+
+logger = logging.getLogger(__name__)
+
+TABLE_PATH = os.path.join(TABLE_DIR, "cube2-distances.bin")
+POSITIONS = 5040 * 729
+FIXED_PIECE = 0  # the D-B-L corner is slot 0 of corner_stickers
+FIXED_FACES = "RUF"
+BUILD_CHUNK = 200_000
+
+
+def _indices(codes):
+    """Table index for every row of a (k, 8) array of normalised corner codes"""
+    slots, twists = np.divmod(codes[:, 1:].astype(np.int64), 3)
+    return permutation_ranks(slots - 1, slot_count=7) * 729 + twist_ranks(twists[:, :6])
+
+
+def build_table(path=TABLE_PATH):
+    model = CornerModel(2)
+    move_tables = np.array([table for name, table in model.move_tables.items() if name[0] in FIXED_FACES],
+                           dtype=np.uint8)
+    distances = np.full(POSITIONS + POSITIONS % 2, UNKNOWN, dtype=np.uint8)
+    start_time = time.time()
+
+    frontier = np.arange(0, 24, 3, dtype=np.uint8)[None, :]  # every piece home, untwisted
+    distances[_indices(frontier)] = 0
+    distance = 0
+    while len(frontier):
+        distance += 1
+        next_levels = []
+        for begin in range(0, len(frontier), BUILD_CHUNK):
+            children = move_tables[:, frontier[begin:begin + BUILD_CHUNK]].reshape(-1, 8)
+            indices = _indices(children)
+            fresh = distances[indices] == UNKNOWN
+            indices, first = np.unique(indices[fresh], return_index=True)
+            distances[indices] = distance
+            next_levels.append(children[fresh][first])
+        frontier = np.concatenate(next_levels)
+        logger.info("2x2x2 table: depth %d, %d positions", distance, len(frontier))
+
+    reached = int((distances[:POSITIONS] != UNKNOWN).sum())
+    if reached != POSITIONS:
+        raise RuntimeError(f"2x2x2 BFS reached {reached} of {POSITIONS} positions")
+
+    write_table(path, (distances[0::2] | (distances[1::2] << 4)).tobytes())
+    logger.info("built %s in %.1fs", path, time.time() - start_time)
+    return path
+
+
+class Cube2Table:
+    """Memory-mapped distances to solved for every 2x2x2 position"""
+
+    def __init__(self, path=TABLE_PATH, build_missing=True):
+        if not os.path.exists(path):
+            if not build_missing:
+                raise FileNotFoundError(path)
+            logger.info("2x2x2 table %s not found, building it", path)
+            build_table(path)
+        with open(path, "rb") as f:
+            self.table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.model = CornerModel(2)
+        self.moves = face_turns(2)
+
+        # Corner code of the fixed piece -> rotation that brings it home untwisted
+        home = self.model.slots[FIXED_PIECE][0]
+        self.normalising = {}
+        for perm in cube_rotations(2):
+            source = perm[home]  # the sticker this rotation moves onto the home sticker
+            for s, slot in enumerate(self.model.slots):
+                if source in slot:
+                    self.normalising[s * 3 + slot.index(source)] = perm
+
+    def index(self, state):
+        codes = self.model.corner_codes(state)
+        if codes[FIXED_PIECE] != 0:
+            perm = self.normalising[codes[FIXED_PIECE]]
+            codes = self.model.corner_codes(bytes(state[i] for i in perm))
+        slots = [code // 3 - 1 for code in codes[1:]]
+        rank = 0
+        for k, slot in enumerate(slots):
+            rank = rank * (7 - k) + slot - sum(1 for previous in slots[:k] if previous < slot)
+        twists = 0
+        for code in codes[1:7]:
+            twists = twists * 3 + code % 3
+        return rank * 729 + twists
+
+    def distance(self, state):
+        index = self.index(cube_to_state(state))
+        return (self.table[index >> 1] >> ((index & 1) << 2)) & 0xF
+
+    def solve(self, state):
+        """Optimal move list: step to any neighbour one closer to solved"""
+        state = cube_to_state(state)
+        remaining = self.distance(state)
+        solution = []
+        while remaining:
+            for move_name, move in self.moves:
+                child = move(state)
+                if self.distance(child) == remaining - 1:
+                    solution.append(move_name)
+                    state, remaining = child, remaining - 1
+                    break
+        return solution
+
+
+_loaded = None
+
+def load_table():
+    """Process-wide Cube2Table, so every solve shares one mapping"""
+    global _loaded
+    if _loaded is None:
+        _loaded = Cube2Table()
+    return _loaded
+
+
+def table_solve(initial_state, max_depth=20, memory_sample_every=1000, memory_sample_seconds=None, table=None):
+    """Solver-compatible 2x2x2 solve by table lookups only (no search).
+
+    `table` is an optional TranspositionTable to warm with the solution.
+    """
+    distances = load_table()
+    start_time = time.time()
+    sampler = MemorySampler(memory_sample_every, memory_sample_seconds)
+    initial_state = cube_to_state(initial_state)
+    distance = distances.distance(initial_state)
+    solution = distances.solve(initial_state) if distance <= max_depth else None
+    if table is not None and solution is not None:
+        table.store_solution(initial_state, solution, dict(distances.moves))
+    return {'solution': solution, 'optimal_length': distance,
+            **_search_stats(sampler, len(solution or []), start_time)}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    build_table()
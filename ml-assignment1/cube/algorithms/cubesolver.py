@@ -1,208 +1,514 @@
 import time
 import heapq
+import logging
 import psutil
-from collections import deque
-from cube import is_solved  # Assuming your `cube.py` has is_solved()
+from cube import (is_solved, cube_to_state, state_size, face_turns, is_redundant_pair, goal_states, inverse_move,
+                  canonicalize, iter_children)
+from algorithms.patterndb import load_heuristic
 
-# Define dummy move functions (replace with real logic)
-def move_R(cube):
-    return cube[:]  # Return a shallow copy if cube is a list
+logger = logging.getLogger(__name__)
 
-def move_U(cube):
-    return cube[:]
 
-def move_F(cube):
-    return cube[:]
+class MemorySampler:
+    """Tracks peak RSS without a psutil syscall per node.
 
-# Define available moves
-all_moves = [
-    (move_R, "R"),
-    (move_U, "U"),
-    (move_F, "F"),
-]
+    Memory is sampled every `every_nodes` nodes counted by tick(), which
+    counts one node per call or a whole batch with tick(len(batch)). If
+    `every_seconds` is given the sampler runs on a timer instead: the clock
+    is read every `every_nodes` nodes and a sample is taken once the interval
+    has passed.
+    """
 
-def dfs(initial_state, max_depth=20):
-    print(f"DFS DEBUG: Starting with max_depth={max_depth}")
-    print(f"DFS DEBUG: Initial state: {initial_state}")
-    print(f"DFS DEBUG: Is initially solved? {is_solved(initial_state)}")
-    print(f"DFS DEBUG: Number of available moves: {len(all_moves)}")
+    def __init__(self, every_nodes=1000, every_seconds=None):
+        self.every_nodes = max(1, every_nodes)
+        self.every_seconds = every_seconds
+        self.process = psutil.Process()
+        self.samples = 0
+        self.initial_memory = self._rss()
+        self.max_memory = self.initial_memory
+        self._countdown = self.every_nodes
+        self._last_sample = time.time()
+
+    def _rss(self):
+        return self.process.memory_info().rss / (1024 * 1024)
+
+    def sample(self):
+        self.samples += 1
+        self.max_memory = max(self.max_memory, self._rss())
+        self._last_sample = time.time()
+
+    def tick(self, nodes=1):
+        self._countdown -= nodes
+        if self._countdown > 0:
+            return
+        self._countdown = self.every_nodes
+        if self.every_seconds is None or time.time() - self._last_sample >= self.every_seconds:
+            self.sample()
+
+    def peak_delta(self):
+        return self.max_memory - self.initial_memory
+
+
+def _unwind_path(link):
+    """Rebuild a move list from a parent link.
+
+    Search nodes carry their path as nested (parent_link, move_name) pairs
+    with None for the root, so pushing a child is O(1) instead of copying
+    the whole move list. The list is only built when a solution is returned.
+    """
+    moves = []
+    while link is not None:
+        link, move_name = link
+        moves.append(move_name)
+    moves.reverse()
+    return moves
+
+
+def _table_stats(table, snapshot):
+    """Transposition-table hit rates for one run, empty when no table is used"""
+    return table.stats_since(snapshot) if table is not None else {}
+
+
+def _exact_tail(table, state, apply):
+    """Moves from `state` to solved known exactly by the table, else None"""
+    if table is None:
+        return None
+    entry = table.lookup(state)
+    if entry is None or not entry[2]:
+        return None
+    return table.exact_path(state, apply)
+
+
+def _table_bounded(heuristic, table):
+    """Heuristic raised to any distance or lower bound the table knows"""
+    def bounded(state):
+        h = heuristic(state)
+        entry = table.lookup(state)
+        return max(h, entry[0]) if entry is not None else h
+    return bounded
+
+
+class SymmetryKeys:
+    """Visited-set keys that merge the 48 symmetric twins of a state.
+
+    Twins are equally far from solved, so a search may skip a state once any
+    twin has been reached at the same or a smaller depth. Also counts how many
+    plain states the stored classes stand for, which bounds the saving; the
+    twins of a state near the scramble are rarely near it themselves, so
+    symmetry_reduction() measures what a search actually saves.
+    """
 
-    start_time = time.time()
-    process = psutil.Process()
-    initial_memory = process.memory_info().rss / (1024 * 1024)
-    max_memory = initial_memory
-    stack = [(initial_state, [], 0)]
-    visited = set()
-    nodes_expanded = 0
+    def __init__(self):
+        self.class_sizes = {}
 
-    while stack:
-        current_state, moves, depth = stack.pop()
-        current_memory = process.memory_info().rss / (1024 * 1024)
-        max_memory = max(max_memory, current_memory)
+    def __call__(self, state):
+        key, _, class_size = canonicalize(state)
+        self.class_sizes[key] = class_size
+        return key
 
-        print(f"DFS DEBUG: Checking state at depth {depth}, moves: {moves}")
-        print(f"DFS DEBUG: Is current state solved? {is_solved(current_state)}")
+    def stats(self, visited):
+        represented = sum(self.class_sizes[key] for key in visited)
+        return {
+            'symmetry_classes': len(visited),
+            'states_per_class': represented / len(visited) if visited else 1.0,
+        }
 
-        if is_solved(current_state):
-            print(f"DFS DEBUG: SOLUTION FOUND! Moves: {moves}")
-            end_time = time.time()
-            return {
-                'solution': moves,
-                'nodes_expanded': nodes_expanded,
-                'time_taken': end_time - start_time,
-                'max_memory': max_memory - initial_memory
-            }
-
-        state_hash = str(current_state)
-        if state_hash in visited or depth >= max_depth:
-            continue
 
-        visited.add(state_hash)
-        nodes_expanded += 1
+def _symmetry_keys(symmetry):
+    """Key function for visited sets: canonical states with symmetry, else None for the states themselves"""
+    return SymmetryKeys() if symmetry else None
 
-        for move_func, move_name in reversed(all_moves):
-            try:
-                new_state = move_func(current_state)
-                if new_state is not None:
-                    stack.append((new_state, moves + [move_name], depth + 1))
-            except Exception as e:
-                print(f"DFS DEBUG: Error applying move {move_name}: {e}")
 
-    end_time = time.time()
+def _visited_stats(keys, visited):
+    stats = {'visited_size': len(visited)}
+    if keys is not None:
+        stats.update(keys.stats(visited))
+    return stats
+
+
+def symmetry_reduction(solver, initial_state, **kwargs):
+    """Run a solver with and without symmetry keys and report the reduction factors"""
+    plain = solver(initial_state, **kwargs)
+    reduced = solver(initial_state, symmetry=True, **kwargs)
     return {
-        'solution': None,
-        'nodes_expanded': nodes_expanded,
-        'time_taken': end_time - start_time,
-        'max_memory': max_memory - initial_memory
+        'visited_reduction': plain['visited_size'] / max(1, reduced['visited_size']),
+        'nodes_reduction': plain['nodes_expanded'] / max(1, reduced['nodes_expanded']),
+        'time_ratio': reduced['time_taken'] / plain['time_taken'] if plain['time_taken'] > 0 else 0.0,
+        'same_length': (plain['solution'] is None) == (reduced['solution'] is None) and
+                       (plain['solution'] is None or len(plain['solution']) == len(reduced['solution'])),
+        'plain': plain,
+        'symmetry': reduced,
     }
 
-from collections import deque
-import time
-import psutil
 
-# Example dummy cube operations
-def move_R(cube): return cube[:]  # Replace with real transformation
-def move_U(cube): return cube[:]
-def move_F(cube): return cube[:]
-
-# Sample goal check
-def is_solved(cube): return cube == list(range(len(cube)))  # Replace as needed
+def _search_stats(sampler, nodes_expanded, start_time):
+    """Common metrics for the results dict of every solver"""
+    sampler.sample()  # always include the final footprint
+    elapsed = time.time() - start_time
+    return {
+        'nodes_expanded': nodes_expanded,
+        'time_taken': elapsed,
+        'nodes_per_sec': nodes_expanded / elapsed if elapsed > 0 else 0.0,
+        'max_memory': sampler.peak_delta(),
+        'memory_samples': sampler.samples,
+    }
 
-all_moves = [(move_R, "R"), (move_U, "U"), (move_F, "F")]
+def dfs(initial_state, max_depth=20, memory_sample_every=1000, memory_sample_seconds=None, table=None,
+        symmetry=False):
+    # Evaluated once so disabled tracing costs a single bool test per node
+    debug = logger.isEnabledFor(logging.DEBUG)
+    initial_state = cube_to_state(initial_state)
+    all_moves = face_turns(state_size(initial_state))
+    apply = dict(all_moves)
+    snapshot = table.snapshot() if table is not None else None
+    keys = _symmetry_keys(symmetry)
+    if debug:
+        logger.debug("DFS: starting with max_depth=%d, %d moves available", max_depth, len(all_moves))
+        logger.debug("DFS: initial state %s", initial_state)
 
-def exhaustive_bfs_all_nodes(initial_state, max_depth=5):
     start_time = time.time()
-    process = psutil.Process()
-    initial_memory = process.memory_info().rss / (1024 * 1024)
-    max_memory = initial_memory
-
-    queue = deque([(initial_state, [], 0)])
-    visited = set()
-    solutions = []
-    all_nodes = set()
+    sampler = MemorySampler(memory_sample_every, memory_sample_seconds)
+    stack = [(initial_state, None, 0)]
+    visited = {}
     nodes_expanded = 0
 
-    while queue:
-        current_state, path, depth = queue.popleft()
-        current_memory = process.memory_info().rss / (1024 * 1024)
-        max_memory = max(max_memory, current_memory)
+    while stack:
+        current_state, moves, depth = stack.pop()
+        sampler.tick()
+
+        if debug:
+            logger.debug("DFS: checking state at depth %d, moves: %s", depth, _unwind_path(moves))
 
-        state_hash = str(current_state)
-        if state_hash in visited or depth > max_depth:
+        if is_solved(current_state):
+            solution = _unwind_path(moves)
+            if debug:
+                logger.debug("DFS: solution found: %s", solution)
+            return {'solution': solution, **_search_stats(sampler, nodes_expanded, start_time),
+                    **_table_stats(table, snapshot), **_visited_stats(keys, visited)}
+
+        if depth >= max_depth:
             continue
+        key = keys(current_state) if keys is not None else current_state
+        if visited.get(key, max_depth) <= depth:
+            continue
+
+        # A state with a known distance finishes the search if it fits the depth limit
+        tail = _exact_tail(table, current_state, apply)
+        if tail is not None and depth + len(tail) <= max_depth:
+            return {'solution': _unwind_path(moves) + tail, **_search_stats(sampler, nodes_expanded, start_time),
+                    **_table_stats(table, snapshot), **_visited_stats(keys, visited)}
 
-        visited.add(state_hash)
-        all_nodes.add(state_hash)
+        # Keep the shallowest depth so a state first reached on a long branch
+        # can still be expanded when a shorter path to it turns up
+        visited[key] = depth
         nodes_expanded += 1
 
-        if is_solved(current_state):
-            solutions.append(path)  # Collect all solutions, not just first
+        for move_name, move in reversed(all_moves):
+            stack.append((move(current_state), (moves, move_name), depth + 1))
 
-        if depth == max_depth:
-            continue
+    return {'solution': None, **_search_stats(sampler, nodes_expanded, start_time), **_table_stats(table, snapshot),
+            **_visited_stats(keys, visited)}
+
+def exhaustive_bfs_all_nodes(initial_state, max_depth=5, memory_sample_every=1000, memory_sample_seconds=None,
+                             table=None, symmetry=False):
+    """Every state within max_depth, level by level, with all solutions found.
+
+    With symmetry=True one state per symmetry class is kept, so the counts
+    are of classes and only one solution per class of solved states is listed.
+    """
+    start_time = time.time()
+    sampler = MemorySampler(memory_sample_every, memory_sample_seconds)
+    initial_state = cube_to_state(initial_state)
+    size = state_size(initial_state)
+    all_moves = face_turns(size)
+    move_names = [move_name for move_name, _ in all_moves]
+    snapshot = table.snapshot() if table is not None else None
+    keys = _symmetry_keys(symmetry)
+
+    level = [(initial_state, None)]
+    visited = set()
+    solutions = []
+    all_nodes = set()
+    frontier_sizes = [0] * (max_depth + 1)
+    nodes_expanded = 0
 
-        for move_func, move_name in all_moves:
-            try:
-                new_state = move_func(current_state)
-                if new_state is not None:
-                    queue.append((new_state, path + [move_name], depth + 1))
-            except Exception as e:
-                print(f"DEBUG: Error applying move {move_name}: {e}")
+    for depth in range(max_depth + 1):
+        parents = []
+        for current_state, path in level:
+            sampler.tick()
+            key = keys(current_state) if keys is not None else current_state
+            if key in visited:
+                continue
+
+            visited.add(key)
+            all_nodes.add(current_state)
+            frontier_sizes[depth] += 1
+            nodes_expanded += 1
+
+            if is_solved(current_state):
+                solutions.append(_unwind_path(path))  # Collect all solutions, not just first
+            parents.append((current_state, path))
+
+        if depth == max_depth or not parents:
+            break
+        # The whole level is expanded with the batched move kernel; children
+        # come out in the order a per-state queue would have produced them
+        child_paths = ((path, move_name) for _, path in parents for move_name in move_names)
+        level = list(zip(iter_children([state for state, _ in parents], size), child_paths))
+
+    # The search is exhaustive, so the table is only warmed: the first solution is a shortest one
+    if table is not None and solutions:
+        table.store_solution(initial_state, solutions[0], dict(all_moves))
 
-    end_time = time.time()
     return {
+        'solution': solutions[0] if solutions else None,
         'all_solutions': solutions,
-        'nodes_expanded': nodes_expanded,
         'total_unique_nodes': len(all_nodes),
-        'time_taken': end_time - start_time,
-        'max_memory': max_memory - initial_memory,
-        'visited_nodes': all_nodes
+        'frontier_sizes': [count for count in frontier_sizes if count],
+        'visited_nodes': all_nodes,
+        **_search_stats(sampler, nodes_expanded, start_time),
+        **_table_stats(table, snapshot),
+        **_visited_stats(keys, visited)
     }
 
 
-def manhattan_distance_heuristic(cube):
-    """
-    Placeholder heuristic: counts misplaced stickers.
-    Adjust this logic based on your cube's internal structure.
+def a_star(initial_state, max_depth=20, memory_sample_every=1000, memory_sample_seconds=None, heuristic=None,
+           table=None, symmetry=False):
+    """A* over face turns guided by the corner pattern databases.
+
+    `heuristic` maps a compact state to a lower bound on its distance; the
+    default loads (and on first use builds) the tables for this cube size.
+    With a transposition table, its distances tighten the heuristic and a
+    popped state with an exact distance completes an optimal solution.
+    symmetry=True keys the closed set by symmetry class.
     """
-    if isinstance(cube, list):
-        return sum(1 for i, val in enumerate(cube) if val != i)
-    elif isinstance(cube, dict):
-        return sum(1 for k, v in cube.items() if k != v)
-    return 0
+    initial_state = cube_to_state(initial_state)
+    size = state_size(initial_state)
+    all_moves = face_turns(size)
+    apply = dict(all_moves)
+    if heuristic is None:
+        heuristic = load_heuristic(size)
+    snapshot = table.snapshot() if table is not None else None
+    if table is not None:
+        heuristic = _table_bounded(heuristic, table)
+    keys = _symmetry_keys(symmetry)
 
-def a_star(initial_state, max_depth=20):
     start_time = time.time()
-    process = psutil.Process()
-    initial_memory = process.memory_info().rss / (1024 * 1024)
-    max_memory = initial_memory
+    sampler = MemorySampler(memory_sample_every, memory_sample_seconds)
 
-    initial_cost = manhattan_distance_heuristic(initial_state)
-    priority_queue = [(initial_cost, 0, 0, initial_state, [])]
+    initial_cost = heuristic(initial_state)
+    priority_queue = [(initial_cost, 0, 0, initial_state, None)]
     visited = {}
     nodes_expanded = 0
     counter = 1
 
     while priority_queue:
         f, g, _, current_state, moves = heapq.heappop(priority_queue)
-        current_memory = process.memory_info().rss / (1024 * 1024)
-        max_memory = max(max_memory, current_memory)
+        sampler.tick()
 
         if is_solved(current_state):
-            end_time = time.time()
-            return {
-                'solution': moves,
-                'nodes_expanded': nodes_expanded,
-                'time_taken': end_time - start_time,
-                'max_memory': max_memory - initial_memory
-            }
+            solution = _unwind_path(moves)
+            if table is not None:
+                table.store_solution(initial_state, solution, apply)
+            return {'solution': solution, **_search_stats(sampler, nodes_expanded, start_time),
+                    **_table_stats(table, snapshot), **_visited_stats(keys, visited)}
+
+        # f already includes the exact distance, so this is the cheapest completion
+        tail = _exact_tail(table, current_state, apply)
+        if tail is not None:
+            solution = _unwind_path(moves) + tail
+            table.store_solution(initial_state, solution, apply)
+            return {'solution': solution, **_search_stats(sampler, nodes_expanded, start_time),
+                    **_table_stats(table, snapshot), **_visited_stats(keys, visited)}
 
         if g >= max_depth:
             continue
 
-        state_hash = str(current_state)
-        if state_hash in visited and visited[state_hash] <= g:
+        key = keys(current_state) if keys is not None else current_state
+        if visited.get(key, max_depth + 1) <= g:
             continue
 
-        visited[state_hash] = g
+        visited[key] = g
         nodes_expanded += 1
 
-        for move_func, move_name in all_moves:
-            try:
-                new_state = move_func(current_state)
-                if new_state is not None:
-                    new_g = g + 1
-                    new_h = manhattan_distance_heuristic(new_state)
-                    new_f = new_g + new_h
-                    counter += 1
-                    heapq.heappush(priority_queue, (new_f, new_g, counter, new_state, moves + [move_name]))
-            except Exception as e:
-                print(f"A* DEBUG: Error applying move {move_name}: {e}")
-
-    end_time = time.time()
-    return {
-        'solution': None,
-        'nodes_expanded': nodes_expanded,
-        'time_taken': end_time - start_time,
-        'max_memory': max_memory - initial_memory
-    }
+        new_g = g + 1
+        for move_name, move in all_moves:
+            new_state = move(current_state)
+            # With symmetry keys the check waits for the pop, so each child is canonicalized once
+            if keys is None and visited.get(new_state, max_depth + 1) <= new_g:
+                continue
+            new_f = new_g + heuristic(new_state)
+            if new_f > max_depth:
+                continue  # the heuristic is admissible, so this branch cannot finish in time
+            counter += 1
+            heapq.heappush(priority_queue, (new_f, new_g, counter, new_state, (moves, move_name)))
+
+    if table is not None:
+        table.store_lower_bound(initial_state, max_depth + 1)
+    return {'solution': None, **_search_stats(sampler, nodes_expanded, start_time), **_table_stats(table, snapshot),
+            **_visited_stats(keys, visited)}
+
+
+def ida_star(initial_state, max_depth=20, memory_sample_every=1000, memory_sample_seconds=None, heuristic=None,
+             table=None):
+    """Iterative-deepening A* on f = g + h with memory linear in the depth.
+
+    Each iteration is a depth-first search cut off at the current f bound;
+    the next bound is the smallest f that exceeded it. No frontier or visited
+    set is kept. Redundant move sequences are pruned with is_redundant_pair
+    instead, which keeps the search complete and optimal.
+
+    A transposition table raises h to known distances and ends the search
+    at any state whose exact distance fits the bound. Only the root gets
+    lower bounds from failed iterations: the pruned subtrees below it do not
+    bound their own states' true distances.
+    """
+    initial_state = cube_to_state(initial_state)
+    size = state_size(initial_state)
+    apply = dict(face_turns(size))
+    if heuristic is None:
+        heuristic = load_heuristic(size)
+    snapshot = table.snapshot() if table is not None else None
+
+    # Allowed (move_name, move, face) after each face, None meaning the root
+    moves = [(name, move, name[0]) for name, move in face_turns(size)]
+    successors = {previous: [m for m in moves if not is_redundant_pair(previous, m[2])]
+                  for previous in [None] + sorted({m[2] for m in moves})}
+
+    start_time = time.time()
+    sampler = MemorySampler(memory_sample_every, memory_sample_seconds)
+    path = []
+    nodes_expanded = 0
+    iterations = 0
+
+    def search(state, g, bound, previous_face):
+        # Returns the smallest f beyond the bound, or -1 once solved
+        nonlocal nodes_expanded
+        sampler.tick()
+        h = heuristic(state)
+        entry = table.lookup(state) if table is not None else None
+        if entry is not None:
+            h = max(h, entry[0])
+        f = g + h
+        if f > bound:
+            return f
+        if is_solved(state):
+            return -1
+        if entry is not None and entry[2]:
+            tail = table.exact_path(state, apply)
+            if tail is not None:
+                path.extend(tail)
+                return -1
+        nodes_expanded += 1
+        next_bound = float('inf')
+        for move_name, move, face in successors[previous_face]:
+            path.append(move_name)
+            t = search(move(state), g + 1, bound, face)
+            if t == -1:
+                return -1
+            path.pop()
+            next_bound = min(next_bound, t)
+        return next_bound
+
+    bound = heuristic(initial_state)
+    while bound <= max_depth:
+        iterations += 1
+        t = search(initial_state, 0, bound, None)
+        if t == -1:
+            if table is not None:
+                table.store_solution(initial_state, path, apply)
+            return {'solution': list(path), 'iterations': iterations,
+                    **_search_stats(sampler, nodes_expanded, start_time), **_table_stats(table, snapshot)}
+        bound = t
+        if table is not None:
+            table.store_lower_bound(initial_state, bound)
+
+    return {'solution': None, 'iterations': iterations, **_search_stats(sampler, nodes_expanded, start_time),
+            **_table_stats(table, snapshot)}
+
+
+def bidirectional_bfs(initial_state, max_depth=20, memory_sample_every=1000, memory_sample_seconds=None,
+                      table=None):
+    """Meet-in-the-middle BFS between the scramble and the solved cube.
+
+    The forward side applies face turns to the scramble; the backward side
+    applies inverse turns starting from every goal state. Each step expands a
+    whole level of whichever frontier is smaller, and every child is looked up
+    in the other side's map of compact states. The best meeting point found
+    during that level gives an optimal solution, at a cost of roughly
+    2 * b**(d/2) nodes instead of b**d.
+    """
+    initial_state = cube_to_state(initial_state)
+    all_moves = face_turns(state_size(initial_state))
+    undo = {move_name: move for move_name, move in all_moves}
+    backward_moves = [(move_name, undo[inverse_move(move_name)]) for move_name, _ in all_moves]
+    snapshot = table.snapshot() if table is not None else None
+
+    start_time = time.time()
+    sampler = MemorySampler(memory_sample_every, memory_sample_seconds)
+
+    # state -> parent link; backward links hold the forward move from child to parent
+    forward = {initial_state: None}
+    backward = {goal: None for goal in goal_states(state_size(initial_state))}
+    forward_frontier, backward_frontier = [initial_state], list(backward)
+    forward_depth = backward_depth = 0
+    expanded = {'forward': 0, 'backward': 0}
+
+    def finish(meeting, solution=None):
+        if meeting is not None:
+            forward_link, backward_link = meeting
+            solution = _unwind_path(forward_link) + _unwind_path(backward_link)[::-1]
+        if table is not None:
+            if solution is not None:
+                table.store_solution(initial_state, solution, undo)
+            elif forward_depth + backward_depth >= max_depth:
+                table.store_lower_bound(initial_state, max_depth + 1)
+        return {
+            'solution': solution,
+            'nodes_expanded_forward': expanded['forward'],
+            'nodes_expanded_backward': expanded['backward'],
+            'forward_depth': forward_depth,
+            'backward_depth': backward_depth,
+            **_search_stats(sampler, expanded['forward'] + expanded['backward'], start_time),
+            **_table_stats(table, snapshot)
+        }
+
+    if initial_state in backward:
+        return finish((None, None))
+    tail = _exact_tail(table, initial_state, undo)
+    if tail is not None and len(tail) <= max_depth:
+        return finish(None, tail)
+
+    while forward_frontier and backward_frontier and forward_depth + backward_depth < max_depth:
+        grow_forward = len(forward_frontier) <= len(backward_frontier)
+        if grow_forward:
+            frontier, seen, other, moves, side = forward_frontier, forward, backward, all_moves, 'forward'
+        else:
+            frontier, seen, other, moves, side = backward_frontier, backward, forward, backward_moves, 'backward'
+
+        next_frontier = []
+        meeting = None
+        for state in frontier:
+            sampler.tick()
+            expanded[side] += 1
+            link = seen[state]
+            for move_name, move in moves:
+                child = move(state)
+                if child in seen:
+                    continue
+                child_link = (link, move_name)
+                seen[child] = child_link
+                next_frontier.append(child)
+                if meeting is None and child in other:
+                    # Every stored node on the other side is at most its current
+                    # depth, so the first meeting of this level is already optimal
+                    meeting = (child_link, other[child]) if grow_forward else (other[child], child_link)
+
+        if grow_forward:
+            forward_frontier, forward_depth = next_frontier, forward_depth + 1
+        else:
+            backward_frontier, backward_depth = next_frontier, backward_depth + 1
+        if meeting is not None:
+            return finish(meeting)
+
+    return finish(None)
@@ -0,0 +1,240 @@
+"""External-memory BFS that keeps each level in a sorted file on disk.
+
+Compact states have a fixed length, so a level is stored as a file of
+fixed-size records in sorted order. To build level d+1 the previous level is
+streamed back in chunks sized to the memory budget; each chunk is expanded
+with the batched move kernel, sorted and deduplicated in NumPy, and written
+out as a run. The runs are then merged, at most MAX_MERGE_FAN_IN (and no
+more than the memory budget has read buffers for) at a time, in several
+passes if a level produced more runs than that.
+Duplicates inside the level disappear in the merge, and duplicates against
+levels d and d-1 (the only levels a child of level d can belong to) are
+removed by a streaming merge against those files instead of a visited set.
+
+Solutions are recovered without storing paths: a solved state in level d has
+a predecessor in level d-1, which is found by binary search in that file.
+"""
+import heapq
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from cube import is_solved, cube_to_state, state_size, face_turns, inverse_move, expand_batch, unique_states
+from algorithms.cubesolver import MemorySampler, _search_stats
+
+READ_CHUNK_RECORDS = 4096
+MAX_MERGE_FAN_IN = 64
+MIN_READ_BUFFER = 64 * 1024
+
+
+class LevelStore:
+    """Sorted per-level run files of fixed-size compact states"""
+
+    def __init__(self, record_size, work_dir=None, read_records=READ_CHUNK_RECORDS):
+        self.record_size = record_size
+        self.read_records = read_records
+        self.owns_dir = work_dir is None
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix="cube-bfs-")
+        os.makedirs(self.work_dir, exist_ok=True)
+        self.counts = []
+
+    def path(self, name):
+        return os.path.join(self.work_dir, name)
+
+    def level_path(self, depth):
+        return self.path(f"level-{depth:03d}.bin")
+
+    def iter_file(self, path):
+        size = self.record_size
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(size * self.read_records)
+                if not chunk:
+                    return
+                for offset in range(0, len(chunk), size):
+                    yield chunk[offset:offset + size]
+
+    def iter_chunks(self, depth, records):
+        """Stream a level as (k, record_size) uint8 arrays of at most `records` rows"""
+        with open(self.level_path(depth), "rb") as f:
+            while True:
+                chunk = f.read(self.record_size * records)
+                if not chunk:
+                    return
+                yield np.frombuffer(chunk, dtype=np.uint8).reshape(-1, self.record_size)
+
+    def iter_level(self, depth):
+        """Stream the states of one level in sorted order"""
+        if depth < 0 or depth >= len(self.counts):
+            return iter(())
+        return self.iter_file(self.level_path(depth))
+
+    def contains(self, depth, state):
+        """Binary search for a state in a level file"""
+        if depth < 0 or depth >= len(self.counts):
+            return False
+        size = self.record_size
+        lo, hi = 0, self.counts[depth]
+        with open(self.level_path(depth), "rb") as f:
+            while lo < hi:
+                mid = (lo + hi) // 2
+                f.seek(mid * size)
+                record = f.read(size)
+                if record == state:
+                    return True
+                if record < state:
+                    lo = mid + 1
+                else:
+                    hi = mid
+        return False
+
+    def write_sorted(self, path, records):
+        count = 0
+        with open(path, "wb") as f:
+            for record in records:
+                f.write(record)
+                count += 1
+        return count
+
+    def merge(self, runs, fan_in, name):
+        """Merge sorted runs, fan_in at a time, until one pass can finish them.
+
+        Returns the remaining runs (at most fan_in), whose merge the caller
+        streams. Intermediate runs are written as `name`-<pass>-<k>.bin and
+        every merged input is deleted.
+        """
+        merge_pass = 0
+        while len(runs) > fan_in:
+            merged = []
+            for k in range(0, len(runs), fan_in):
+                group = runs[k:k + fan_in]
+                if len(group) == 1:
+                    merged.extend(group)
+                    continue
+                run = self.path(f"{name}-{merge_pass:02d}-{len(merged):04d}.bin")
+                self.write_sorted(run, _unique(heapq.merge(*(self.iter_file(path) for path in group))))
+                for path in group:
+                    os.remove(path)
+                merged.append(run)
+            runs = merged
+            merge_pass += 1
+        return runs
+
+    def cleanup(self):
+        if self.owns_dir:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+def _unique(sorted_records):
+    previous = None
+    for record in sorted_records:
+        if record != previous:
+            yield record
+            previous = record
+
+
+def _difference(sorted_records, *excluded):
+    """Records not present in any of the sorted `excluded` streams"""
+    heads = [next(stream, None) for stream in excluded]
+    for record in sorted_records:
+        duplicate = False
+        for k, stream in enumerate(excluded):
+            while heads[k] is not None and heads[k] < record:
+                heads[k] = next(stream, None)
+            if heads[k] == record:
+                duplicate = True
+        if not duplicate:
+            yield record
+
+
+def external_bfs_all_nodes(initial_state, max_depth=5, memory_budget_mb=64, work_dir=None,
+                           memory_sample_every=1000):
+    """Exhaustive BFS to max_depth whose visited states live on disk.
+
+    In-memory data is bounded by `memory_budget_mb`: it sizes the chunks of
+    expanded children and the read buffers of the merge, and with them how
+    many runs are merged at once. The result has per-level counts, the
+    solutions found, and the LevelStore under 'levels' for streaming states
+    with iter_level(depth). Call levels.cleanup() to delete a temporary
+    work_dir; it is deleted already if the search raises.
+    """
+    initial_state = cube_to_state(initial_state)
+    size = state_size(initial_state)
+    all_moves = face_turns(size)
+    undo = {move_name: move for move_name, move in all_moves}
+    record_size = len(initial_state)
+    # Each parent yields len(all_moves) children, held about three times over
+    # (children, packed keys, deduplicated copy) while a run is prepared
+    budget = int(memory_budget_mb * 1024 * 1024)
+    chunk_records = max(1, budget // (3 * record_size * len(all_moves)))
+    # The final merge also reads levels d and d-1, so it holds fan_in + 2 buffers
+    fan_in = max(2, min(MAX_MERGE_FAN_IN, budget // MIN_READ_BUFFER - 2))
+    read_records = max(1, budget // ((fan_in + 2) * record_size))
+
+    start_time = time.time()
+    sampler = MemorySampler(memory_sample_every)
+    levels = LevelStore(record_size, work_dir, read_records)
+    try:
+        levels.counts.append(levels.write_sorted(levels.level_path(0), [initial_state]))
+        solved_states = [(0, initial_state)] if is_solved(initial_state) else []
+        runs_written = 0
+
+        for depth in range(max_depth):
+            runs = []
+            for chunk in levels.iter_chunks(depth, chunk_records):
+                children = unique_states(expand_batch(chunk, size))
+                sampler.tick(len(chunk))
+                run = levels.path(f"run-{depth + 1:03d}-{len(runs):04d}.bin")
+                with open(run, "wb") as f:
+                    f.write(children.tobytes())
+                runs.append(run)
+            runs_written += len(runs)
+
+            runs = levels.merge(runs, fan_in, f"merge-{depth + 1:03d}")
+            merged = _unique(heapq.merge(*(levels.iter_file(run) for run in runs)))
+            new_states = _difference(merged, levels.iter_level(depth), levels.iter_level(depth - 1))
+
+            def record_solved(states, level=depth + 1):
+                for state in states:
+                    if is_solved(state):
+                        solved_states.append((level, state))
+                    yield state
+
+            count = levels.write_sorted(levels.level_path(depth + 1), record_solved(new_states))
+            for run in runs:
+                os.remove(run)
+            if not count:
+                os.remove(levels.level_path(depth + 1))
+                break
+            levels.counts.append(count)
+
+        def rebuild_path(level, state):
+            moves = []
+            while level > 0:
+                for move_name, _ in all_moves:
+                    parent = undo[inverse_move(move_name)](state)
+                    if levels.contains(level - 1, parent):
+                        moves.append(move_name)
+                        state, level = parent, level - 1
+                        break
+            moves.reverse()
+            return moves
+
+        all_solutions = [rebuild_path(level, state) for level, state in solved_states]
+        # Counted like exhaustive_bfs_all_nodes: every unique state visited
+        nodes_expanded = sum(levels.counts)
+    except BaseException:
+        levels.cleanup()
+        raise
+    return {
+        'solution': all_solutions[0] if all_solutions else None,
+        'all_solutions': all_solutions,
+        'total_unique_nodes': nodes_expanded,
+        'frontier_sizes': list(levels.counts),
+        'runs_written': runs_written,
+        'levels': levels,
+        **_search_stats(sampler, nodes_expanded, start_time)
+    }
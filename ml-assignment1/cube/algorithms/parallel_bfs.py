@@ -0,0 +1,186 @@
+"""Level-synchronous BFS sharded over a pool of worker processes.
+
+Each worker owns one hash partition of the state space (crc32 of the compact
+state modulo the worker count) and keeps the visited set and frontier for
+that partition only. Per level every worker expands its share of the
+frontier, routes each child to its owner's inbox, and then deduplicates what
+it received against its own visited set. The coordinator only hands out
+levels and collects per-level counts, so no state ever passes through it.
+
+Paths travel as move indices packed into an integer (1 is the empty path,
+child = parent * len(moves) + move). For paths of equal length integer order
+equals the serial BFS discovery order, so keeping the smallest key per state
+reproduces exactly the paths exhaustive_bfs_all_nodes reports.
+"""
+import multiprocessing
+import os
+import sys
+import time
+import zlib
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cube import is_solved, cube_to_state, state_size, face_turns, iter_children
+from algorithms.cubesolver import MemorySampler, _search_stats
+
+ROOT_PATH = 1
+
+
+def unpack_path(key, move_names):
+    moves = []
+    base = len(move_names)
+    while key > ROOT_PATH:
+        key, move_index = divmod(key, base)
+        moves.append(move_names[move_index])
+    moves.reverse()
+    return moves
+
+
+def owner(state, workers):
+    return zlib.crc32(state) % workers
+
+
+def _worker(index, workers, size, max_depth, inboxes, command_queue, results, memory_sample_every):
+    base = len(face_turns(size))
+    inbox = inboxes[index]
+    sampler = MemorySampler(memory_sample_every)
+    visited = set()
+    frontier = []  # (state, packed path) owned by this worker at the current level
+
+    while True:
+        command, depth = command_queue.get()
+        if command == 'stop':
+            results.put((index, 'done', sampler.peak_delta(), sampler.samples))
+            return
+        start = time.time()
+
+        if command == 'seed':
+            received = [inbox.get()[1]]
+        else:
+            # Expand this partition's share of the level and route the children
+            buckets = [[] for _ in range(workers)]
+            children = iter_children([state for state, _ in frontier], size)
+            for _, key in frontier:
+                sampler.tick()
+                child_key = key * base
+                for move_index in range(base):
+                    child = next(children)
+                    buckets[owner(child, workers)].append((child, child_key + move_index))
+            for target, bucket in enumerate(buckets):
+                inboxes[target].put((index, bucket))
+            received = [inbox.get()[1] for _ in range(workers)]
+        expand_time = time.time() - start
+
+        # Deduplicate against the partition, keeping the serial BFS path
+        best = {}
+        for bucket in received:
+            for child, key in bucket:
+                if child in visited:
+                    continue
+                if key < best.get(child, key + 1):
+                    best[child] = key
+        visited.update(best)
+        frontier = list(best.items()) if depth < max_depth else []
+        solutions = [key for child, key in best.items() if is_solved(child)]
+        results.put((index, depth, len(best), solutions, expand_time, time.time() - start))
+
+
+def parallel_bfs_all_nodes(initial_state, max_depth=5, workers=None, memory_sample_every=1000):
+    """Exhaustive BFS to max_depth with the frontier sharded over processes.
+
+    Returns the same solutions, node counts and per-level frontier sizes as
+    exhaustive_bfs_all_nodes, plus per-level wall time and the slowest
+    worker's expand/deduplicate times so scaling can be read per level.
+    The visited states stay in the workers and are not returned.
+    """
+    initial_state = cube_to_state(initial_state)
+    size = state_size(initial_state)
+    move_names = [name for name, _ in face_turns(size)]
+    workers = workers or os.cpu_count() or 1
+
+    start_time = time.time()
+    sampler = MemorySampler(memory_sample_every)
+    inboxes = [multiprocessing.Queue() for _ in range(workers)]
+    commands = [multiprocessing.Queue() for _ in range(workers)]
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_worker,
+                                         args=(i, workers, size, max_depth, inboxes, commands[i], results, memory_sample_every),
+                                         daemon=True)
+                 for i in range(workers)]
+    for process in processes:
+        process.start()
+
+    frontier_sizes = []
+    level_stats = []
+    solutions = []
+    try:
+        inboxes[owner(initial_state, workers)].put((None, [(initial_state, ROOT_PATH)]))
+        commands[owner(initial_state, workers)].put(('seed', 0))
+        active = [owner(initial_state, workers)]
+        for depth in range(max_depth + 1):
+            level_start = time.time()
+            if depth > 0:
+                active = range(workers)
+                for queue in commands:
+                    queue.put(('expand', depth))
+            level_new = 0
+            slowest_expand = slowest_total = 0.0
+            for _ in active:
+                _, _, count, found, expand_time, total_time = results.get()
+                level_new += count
+                solutions.extend((depth, key) for key in found)
+                slowest_expand = max(slowest_expand, expand_time)
+                slowest_total = max(slowest_total, total_time)
+            sampler.tick()
+            if not level_new:
+                break
+            frontier_sizes.append(level_new)
+            level_stats.append({'depth': depth, 'frontier_size': level_new,
+                                'time': time.time() - level_start,
+                                'max_expand_time': slowest_expand,
+                                'max_dedupe_time': slowest_total - slowest_expand})
+
+        for queue in commands:
+            queue.put(('stop', None))
+        worker_memory = 0.0
+        worker_samples = 0
+        for _ in range(workers):
+            _, _, peak, samples = results.get()
+            worker_memory += peak
+            worker_samples += samples
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    total_nodes = sum(frontier_sizes)
+    stats = _search_stats(sampler, total_nodes, start_time)
+    stats['max_memory'] += worker_memory
+    stats['memory_samples'] += worker_samples
+    all_solutions = [unpack_path(key, move_names) for _, key in sorted(solutions)]
+    return {
+        'solution': all_solutions[0] if all_solutions else None,
+        'all_solutions': all_solutions,
+        'total_unique_nodes': total_nodes,
+        'frontier_sizes': frontier_sizes,
+        'level_stats': level_stats,
+        'workers': workers,
+        **stats
+    }
+
+
+if __name__ == "__main__":
+    # Scaling sweep: python algorithms/parallel_bfs.py [size] [max_depth]
+    from cube import create_solved_cube, scramble_cube
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    max_depth = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    scrambled, _ = scramble_cube(create_solved_cube(size), max_depth)
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        result = parallel_bfs_all_nodes(scrambled, max_depth, workers=workers)
+        levels = " ".join(f"{level['time']:.2f}" for level in result['level_stats'])
+        print(f"{workers:>3} workers: {result['time_taken']:.2f}s, "
+              f"{result['nodes_per_sec']:,.0f} nodes/s, per level: {levels}")
+        workers *= 2
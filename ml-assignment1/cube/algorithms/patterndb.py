@@ -0,0 +1,228 @@
+"""Corner pattern databases for the cube solvers.
+
+A pattern tracks a subset of the corner pieces and ignores every other
+sticker. Running a BFS backward from the solved cube over that abstraction
+gives the exact number of face turns needed to solve the tracked corners,
+which is an admissible heuristic for the whole cube. Several disjoint
+patterns are combined with max().
+
+Distances are stored with 4 bits per entry in a file under tables/ and read
+back through a memory map, so a table is built once and then shared by
+every solver (and every process) that needs it.
+"""
+import logging
+import mmap
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cube import create_solved_cube, cube_to_state, goal_states, corner_stickers, move_permutations, inverse_permutation
+
+logger = logging.getLogger(__name__)
+
+TABLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tables")
+
+# Corner pieces are numbered by their slot in the solved cube
+DEFAULT_PATTERNS = ((0, 1, 2, 3), (4, 5, 6, 7))
+
+UNKNOWN = 0xF
+
+
+class CornerModel:
+    """Corner slots, piece recognition and corner move tables for one cube size.
+
+    A corner is encoded as slot * 3 + twist, where twist is the position of the
+    piece's U/D sticker within the slot.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.slots = corner_stickers(size)
+        solved = cube_to_state(create_solved_cube(size))
+
+        # Observed color triple of a slot -> (piece, twist)
+        self.pieces = {}
+        for piece, slot in enumerate(self.slots):
+            colors = [solved[i] for i in slot]
+            for twist in range(3):
+                observed = tuple(colors[(k - twist) % 3] for k in range(3))
+                self.pieces[observed] = (piece, twist)
+
+        code_of = {sticker: s * 3 + t for s, slot in enumerate(self.slots) for t, sticker in enumerate(slot)}
+        self.move_tables = {}
+        for name, perm in move_permutations(size).items():
+            destination = inverse_permutation(perm)
+            self.move_tables[name] = tuple(code_of[destination[sticker]]
+                                           for slot in self.slots for sticker in slot)
+
+    def corner_codes(self, state):
+        """slot * 3 + twist for each corner piece of a compact state"""
+        codes = [0] * 8
+        pieces = self.pieces
+        for s, (a, b, c) in enumerate(self.slots):
+            piece, twist = pieces[(state[a], state[b], state[c])]
+            codes[piece] = s * 3 + twist
+        return codes
+
+    def goal_codes(self):
+        """Corner codes of the goal states (all 24 orientations on a 2x2x2)"""
+        return sorted({tuple(self.corner_codes(state)) for state in goal_states(self.size)})
+
+
+def pattern_index(codes, pieces):
+    """Rank (slots as a partial permutation of 8) * 3**k + twists"""
+    index = 0
+    used = 0
+    remaining = 8
+    twists = 0
+    for piece in pieces:
+        slot, twist = divmod(codes[piece], 3)
+        smaller_used = bin(used & ((1 << slot) - 1)).count("1")
+        index = index * remaining + slot - smaller_used
+        remaining -= 1
+        used |= 1 << slot
+        twists = twists * 3 + twist
+    return index * 3 ** len(pieces) + twists
+
+
+def permutation_ranks(slots, slot_count=8):
+    """Rank of each row of distinct slots as a partial permutation of slot_count"""
+    index = np.zeros(len(slots), dtype=np.int64)
+    for k in range(slots.shape[1]):
+        smaller_used = (slots[:, :k] < slots[:, k:k + 1]).sum(axis=1)
+        index = index * (slot_count - k) + slots[:, k] - smaller_used
+    return index
+
+
+def twist_ranks(twists):
+    index = np.zeros(len(twists), dtype=np.int64)
+    for k in range(twists.shape[1]):
+        index = index * 3 + twists[:, k]
+    return index
+
+
+def pattern_indices(tracked):
+    """pattern_index for every row of a (k, len(pieces)) array of corner codes"""
+    slots, twists = np.divmod(tracked.astype(np.int64), 3)
+    return permutation_ranks(slots) * 3 ** tracked.shape[1] + twist_ranks(twists)
+
+
+def pattern_entries(pieces):
+    count = 1
+    for k in range(len(pieces)):
+        count *= 8 - k
+    return count * 3 ** len(pieces)
+
+
+def table_path(size, pieces, table_dir=TABLE_DIR):
+    return os.path.join(table_dir, f"corners-{size}x{size}-{''.join(map(str, pieces))}.pdb")
+
+
+def write_table(path, data):
+    """Write a table file atomically.
+
+    The bytes go to a temporary file in the same directory, which is then
+    renamed over `path`. A process that finds the file can therefore always
+    map all of it. Processes that build the same table at once each write
+    their own temporary file, and the last rename wins.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def build_pattern_database(size, pieces, path=None):
+    """BFS backward from the goal over the tracked corners and write the table.
+
+    Levels are expanded a whole frontier at a time: one fancy-indexing pass
+    over the corner move tables yields every child, and np.unique on their
+    table indices deduplicates them.
+    """
+    path = path or table_path(size, pieces)
+    model = CornerModel(size)
+    entries = pattern_entries(pieces)
+    move_tables = np.array(list(model.move_tables.values()), dtype=np.uint8)
+    distances = np.full(entries + entries % 2, UNKNOWN, dtype=np.uint8)
+    start_time = time.time()
+
+    frontier = np.array([[codes[piece] for piece in pieces] for codes in model.goal_codes()], dtype=np.uint8)
+    indices, first = np.unique(pattern_indices(frontier), return_index=True)
+    frontier = frontier[first]
+    distances[indices] = 0
+
+    distance = 0
+    while len(frontier):
+        distance += 1
+        children = move_tables[:, frontier].reshape(-1, len(pieces))
+        indices = pattern_indices(children)
+        fresh = distances[indices] == UNKNOWN
+        indices, first = np.unique(indices[fresh], return_index=True)
+        frontier = children[fresh][first]
+        distances[indices] = distance
+        logger.info("pattern %s: depth %d, %d states", pieces, distance, len(frontier))
+
+    # Two entries per byte, even indices in the low nibble
+    table = distances[0::2] | (distances[1::2] << 4)
+    write_table(path, table.tobytes())
+    logger.info("built %s (%d entries) in %.1fs", path, entries, time.time() - start_time)
+    return path
+
+
+class PatternDatabase:
+    """Read-only view of one table file through a memory map"""
+
+    def __init__(self, size, pieces, path=None, build_missing=True):
+        self.size = size
+        self.pieces = tuple(pieces)
+        self.path = path or table_path(size, self.pieces)
+        if not os.path.exists(self.path):
+            if not build_missing:
+                raise FileNotFoundError(self.path)
+            logger.info("pattern database %s not found, building it", self.path)
+            build_pattern_database(size, self.pieces, self.path)
+        with open(self.path, "rb") as f:
+            self.table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def distance(self, codes):
+        index = pattern_index(codes, self.pieces)
+        return (self.table[index >> 1] >> ((index & 1) << 2)) & 0xF
+
+
+class CornerHeuristic:
+    """max() over disjoint corner pattern databases; callable on compact states"""
+
+    def __init__(self, size, patterns=DEFAULT_PATTERNS, build_missing=True):
+        self.model = CornerModel(size)
+        self.databases = [PatternDatabase(size, pieces, build_missing=build_missing) for pieces in patterns]
+
+    def __call__(self, state):
+        codes = self.model.corner_codes(state)
+        return max(db.distance(codes) for db in self.databases)
+
+
+_loaded = {}
+
+def load_heuristic(size, patterns=DEFAULT_PATTERNS):
+    """Process-wide cached heuristic, so repeated solves share the mapped tables"""
+    key = (size, tuple(patterns))
+    if key not in _loaded:
+        _loaded[key] = CornerHeuristic(size, patterns)
+    return _loaded[key]
+
+
+if __name__ == "__main__":
+    # Offline build: python algorithms/patterndb.py [size ...]
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    for size in map(int, sys.argv[1:] or ["2", "3"]):
+        for pieces in DEFAULT_PATTERNS:
+            build_pattern_database(size, pieces)
@@ -0,0 +1,98 @@
+"""Transposition table of distances to solved, shared between solver runs.
+
+Entries are keyed by compact state and hold (distance, best_move, exact).
+Exact entries come from optimal solutions: every state on an optimal path
+is exactly as far from solved as the rest of that path, and the next move of
+the path is its best move. Inexact entries are lower bounds learned from
+searches that failed. The table is capped at `max_entries` with LRU eviction
+and can be pickled to disk between runs.
+"""
+import os
+import pickle
+from collections import OrderedDict
+
+
+class TranspositionTable:
+
+    def __init__(self, max_entries=1_000_000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lookups = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, state):
+        self.lookups += 1
+        entry = self.entries.get(state)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(state)
+        return entry
+
+    def _put(self, state, entry):
+        self.entries[state] = entry
+        self.entries.move_to_end(state)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def store_lower_bound(self, state, distance):
+        entry = self.entries.get(state)
+        if entry is None or (not entry[2] and entry[0] < distance):
+            self._put(state, (distance, None, False))
+
+    def store_solution(self, state, moves, apply):
+        """Record an optimal solution; `apply` maps move names to state functions"""
+        remaining = len(moves)
+        for move_name in moves:
+            self._put(state, (remaining, move_name, True))
+            state = apply[move_name](state)
+            remaining -= 1
+        self._put(state, (0, None, True))
+
+    def exact_path(self, state, apply):
+        """Follow best moves from an exact entry, or None if the chain was evicted"""
+        entry = self.entries.get(state)
+        moves = []
+        while entry is not None and entry[2] and entry[0] > 0:
+            moves.append(entry[1])
+            state = apply[entry[1]](state)
+            entry = self.entries.get(state)
+        if entry is None or not entry[2]:
+            return None
+        return moves
+
+    def snapshot(self):
+        return self.lookups, self.hits
+
+    def stats_since(self, snapshot):
+        """Hit-rate metrics for the results dict of one solver run"""
+        lookups = self.lookups - snapshot[0]
+        hits = self.hits - snapshot[1]
+        return {
+            'tt_lookups': lookups,
+            'tt_hits': hits,
+            'tt_hit_rate': hits / lookups if lookups else 0.0,
+            'tt_entries': len(self.entries),
+            'tt_evictions': self.evictions,
+        }
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump((self.max_entries, list(self.entries.items())), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path, max_entries=None):
+        """Table saved by save(), or an empty one if the file does not exist"""
+        if not os.path.exists(path):
+            return cls(max_entries or 1_000_000)
+        with open(path, "rb") as f:
+            saved_max, items = pickle.load(f)
+        table = cls(max_entries or saved_max)
+        for state, entry in items[-table.max_entries:]:
+            table.entries[state] = entry
+        return table
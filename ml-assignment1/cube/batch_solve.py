@@ -0,0 +1,259 @@
+"""Solve many scrambles over a process pool and stream the results to disk.
+
+Scrambles come from a file or from any iterable of dicts with 'id', 'size'
+and 'scramble' (a list of move names). Every worker process loads the move
+tables and heuristics once when it starts. After that only the compact
+state and the result row cross the process boundary. A per-scramble time
+budget is enforced inside the worker with an interval timer, so a scramble
+that runs long is cut off and the worker moves on to the next one.
+
+Rows are written as they complete, to CSV or JSONL depending on the output
+file's extension, so a long batch can be watched (or killed) without losing
+what is already solved.
+"""
+import argparse
+import contextlib
+import csv
+import json
+import multiprocessing
+import os
+import random
+import signal
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from cube import create_solved_cube, cube_to_state, apply_move, face_turns, is_redundant_pair
+from algorithms.cubesolver import dfs, exhaustive_bfs_all_nodes, a_star, ida_star, bidirectional_bfs
+from algorithms.patterndb import load_heuristic
+from algorithms.cube2_table import table_solve, load_table
+
+SOLVERS = {
+    'DFS': dfs,
+    'BFS': exhaustive_bfs_all_nodes,
+    'A*': a_star,
+    'IDA*': ida_star,
+    'BiBFS': bidirectional_bfs,
+    'Table': table_solve,
+}
+
+FIELDS = ['id', 'size', 'scramble_depth', 'scramble', 'algorithm', 'status', 'solution_length', 'solution',
+          'nodes_expanded', 'time_taken', 'nodes_per_sec', 'max_memory', 'optimal', 'worker']
+
+
+def generate_scrambles(count, size=3, depth=10, seed=0):
+    """Seeded random scrambles that never turn the same face twice in a row"""
+    rng = random.Random(seed)
+    names = [name for name, _ in face_turns(size)]
+    for scramble_id in range(count):
+        moves = []
+        while len(moves) < depth:
+            name = rng.choice(names)
+            if not moves or not is_redundant_pair(moves[-1][0], name[0]):
+                moves.append(name)
+        yield {'id': scramble_id, 'size': size, 'scramble': moves}
+
+
+def read_scrambles(path):
+    """Scrambles from a .jsonl file or a text file of '<size> <move> <move> ...' lines"""
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if path.endswith(".jsonl"):
+                item = json.loads(line)
+                moves = item['scramble']
+                yield {'id': item.get('id', line_number), 'size': int(item['size']),
+                       'scramble': moves.split() if isinstance(moves, str) else list(moves)}
+            else:
+                size, *moves = line.split()
+                yield {'id': line_number, 'size': int(size), 'scramble': moves}
+
+
+def check_solver_size(algorithm, size):
+    """ValueError for an algorithm that cannot solve cubes of this size"""
+    if algorithm == 'Table' and size != 2:
+        raise ValueError(f"the Table solver only solves 2x2x2 cubes, not {size}x{size}x{size}")
+
+
+def scramble_state(size, moves):
+    state = cube_to_state(create_solved_cube(size))
+    for name in moves:
+        state = apply_move(state, name)
+    return state
+
+
+def result_row(result, **fields):
+    """Flat, serialisable row for one solver result (drops visited sets and the like)"""
+    solution = result.get('solution')
+    row = dict(fields)
+    row.setdefault('status', 'solved' if solution is not None else 'unsolved')
+    row['solution_length'] = len(solution) if solution is not None else None
+    row['solution'] = " ".join(solution) if solution is not None else None
+    for key in ('nodes_expanded', 'time_taken', 'nodes_per_sec', 'max_memory', 'optimal'):
+        if key in result:
+            row[key] = result[key]
+    return row
+
+
+class ResultWriter:
+    """Append result rows to a CSV or JSONL file, flushing each row"""
+
+    def __init__(self, path, fields=FIELDS):
+        self.path = path
+        self.jsonl = path.endswith(".jsonl")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.file = open(path, "w", newline="")
+        if not self.jsonl:
+            self.csv = csv.DictWriter(self.file, fieldnames=fields, restval="", extrasaction="ignore")
+            self.csv.writeheader()
+        self.rows = 0
+
+    def write(self, row):
+        if self.jsonl:
+            self.file.write(json.dumps(row) + "\n")
+        else:
+            self.csv.writerow(row)
+        self.file.flush()
+        self.rows += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SolveTimeout(Exception):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise SolveTimeout()
+
+
+@contextlib.contextmanager
+def time_budget(seconds):
+    """Raise SolveTimeout in the main thread once `seconds` have passed.
+
+    A no-op for None/0 or where the platform has no interval timers.
+    """
+    if not seconds or not hasattr(signal, "setitimer"):
+        yield
+        return
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def load_tables(algorithm, sizes):
+    """Load (building them first if missing) the tables `algorithm` needs for these cube sizes"""
+    for size in sizes:
+        face_turns(size)
+        if algorithm in ('A*', 'IDA*'):
+            load_heuristic(size)
+        if algorithm == 'Table' and size == 2:
+            load_table()
+
+
+_worker_config = {}
+
+def _init_worker(algorithm, max_depth, time_budget, preload_sizes):
+    """Pool initializer: load tables once so no solve pays for them"""
+    _worker_config.update(algorithm=algorithm, max_depth=max_depth, time_budget=time_budget)
+    load_tables(algorithm, preload_sizes)
+
+
+def _solve_one(item):
+    algorithm = _worker_config['algorithm']
+    budget = _worker_config['time_budget']
+    fields = {'id': item['id'], 'size': item['size'], 'scramble_depth': len(item['scramble']),
+              'scramble': " ".join(item['scramble']), 'algorithm': algorithm, 'worker': os.getpid()}
+    start_time = time.time()
+    try:
+        check_solver_size(algorithm, item['size'])
+        state = scramble_state(item['size'], item['scramble'])
+        with time_budget(budget):
+            result = SOLVERS[algorithm](state, _worker_config['max_depth'])
+        return result_row(result, **fields)
+    except SolveTimeout:
+        return {**fields, 'status': 'timeout', 'time_taken': time.time() - start_time}
+    except Exception as error:
+        return {**fields, 'status': f'error: {error!r}', 'time_taken': time.time() - start_time}
+
+
+def solve_batch(scrambles, output, algorithm='IDA*', max_depth=20, workers=None, time_budget=None,
+                preload_sizes=(2, 3), chunksize=1):
+    """Solve every scramble on a process pool, writing one row per scramble as it completes.
+
+    `time_budget` is in seconds per scramble (None for no limit); over-budget
+    scrambles get status 'timeout'. A list of scrambles is checked against
+    the algorithm before the pool starts; in a stream, a scramble the
+    algorithm cannot solve gets an error row. Returns a summary of the batch.
+    """
+    if algorithm not in SOLVERS:
+        raise ValueError(f"unknown algorithm {algorithm!r}, expected one of {', '.join(SOLVERS)}")
+    if isinstance(scrambles, (list, tuple)):
+        for size in {item['size'] for item in scrambles}:
+            check_solver_size(algorithm, size)
+    start_time = time.time()
+    # Missing tables are built here once, not by every worker at the same time
+    load_tables(algorithm, preload_sizes)
+    counts = {}
+    with ResultWriter(output) as writer, \
+            multiprocessing.Pool(workers, initializer=_init_worker,
+                                 initargs=(algorithm, max_depth, time_budget, tuple(preload_sizes))) as pool:
+        for row in pool.imap_unordered(_solve_one, scrambles, chunksize):
+            writer.write(row)
+            status = row['status'] if not row['status'].startswith('error') else 'error'
+            counts[status] = counts.get(status, 0) + 1
+        total = writer.rows
+    elapsed = time.time() - start_time
+    return {
+        'scrambles': total,
+        'solved': counts.get('solved', 0),
+        'unsolved': counts.get('unsolved', 0),
+        'timeouts': counts.get('timeout', 0),
+        'errors': counts.get('error', 0),
+        'time_taken': elapsed,
+        'scrambles_per_sec': total / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve a batch of scrambles on a process pool")
+    parser.add_argument("--input", help="scramble file (.jsonl or '<size> <moves...>' lines); random if omitted")
+    parser.add_argument("--count", type=int, default=1000, help="random scrambles to generate")
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--depth", type=int, default=8, help="random scramble length")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--algorithm", default="IDA*", choices=list(SOLVERS))
+    parser.add_argument("--max-depth", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--time-budget", type=float, default=None, help="seconds per scramble")
+    parser.add_argument("--output", default="results/batch.csv", help=".csv or .jsonl")
+    args = parser.parse_args()
+    if not args.input:
+        try:
+            check_solver_size(args.algorithm, args.size)
+        except ValueError as error:
+            parser.error(str(error))
+
+    if args.input:
+        scrambles = read_scrambles(args.input)
+    else:
+        scrambles = generate_scrambles(args.count, args.size, args.depth, args.seed)
+    summary = solve_batch(scrambles, args.output, args.algorithm, args.max_depth, args.workers,
+                          args.time_budget, preload_sizes=[args.size] if not args.input else (2, 3))
+    print(f"{summary['scrambles']} scrambles in {summary['time_taken']:.2f}s "
+          f"({summary['scrambles_per_sec']:.1f}/s): {summary['solved']} solved, "
+          f"{summary['unsolved']} unsolved, {summary['timeouts']} timed out, {summary['errors']} errors")
+    print(f"Results written to {args.output}")
@@ -0,0 +1,35 @@
+import sys
+import time
+
+from cube import create_solved_cube, scramble_cube, cube_to_state, face_turns, states_to_array, expand_batch, unique_states
+
+def benchmark_move_expansion(size=3, frontier_size=20000, repeats=3):
+    """Children generated per second: per-state Python expansion vs expand_batch"""
+    frontier = [cube_to_state(scramble_cube(create_solved_cube(size), 20)[0]) for _ in range(frontier_size)]
+    moves = face_turns(size)
+    array = states_to_array(frontier)
+
+    def best_of(run):
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    children = frontier_size * len(moves)
+    timings = {
+        'per-state': best_of(lambda: [move(state) for state in frontier for _, move in moves]),
+        'per-state + set dedupe': best_of(lambda: {move(state) for state in frontier for _, move in moves}),
+        'batch': best_of(lambda: expand_batch(array, size)),
+        'batch + unique': best_of(lambda: unique_states(expand_batch(array, size))),
+    }
+
+    print(f"{size}x{size}x{size}, {frontier_size} frontier states, {children} children")
+    for name, seconds in timings.items():
+        print(f"  {name:24} {children / seconds:>14,.0f} states/sec")
+    return timings
+
+if __name__ == "__main__":
+    for size in map(int, sys.argv[1:] or ["2", "3", "4"]):
+        benchmark_move_expansion(size)
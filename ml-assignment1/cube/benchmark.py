@@ -0,0 +1,187 @@
+"""Benchmark the cube solvers on a fixed corpus and compare against a baseline.
+
+One scramble per cell, as test_algorithms runs, is too noisy to compare
+solvers. The benchmark corpus is a versioned file of seeded scrambles, with
+many per (size, depth) cell. Every solver solves every scramble of a cell in
+this process, one after another. The report gives per cell the median and
+p95 time, median nodes/sec, median nodes expanded and mean solution length.
+
+A run can be saved as the baseline and later runs compared to it. Node
+counts and solution lengths are deterministic, so any change in them is
+flagged. Times are flagged when the median slows down by more than the
+tolerance. Only compare baselines recorded on the same machine.
+
+    python benchmark.py --save-baseline     # once, on the reference commit
+    python benchmark.py                     # later: exits 1 on a regression
+"""
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from batch_solve import SOLVERS, generate_scrambles, read_scrambles, scramble_state, time_budget, SolveTimeout
+
+CORPUS_VERSION = 1
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks")
+CORPUS_CELLS = {2: (4, 6, 8), 3: (4, 6, 8)}
+SCRAMBLES_PER_CELL = 20
+DEFAULT_SOLVERS = ('Table', 'A*', 'IDA*', 'BiBFS')
+BASELINE_PATH = "results/benchmark-baseline.json"
+
+
+def corpus_path(version=CORPUS_VERSION):
+    return os.path.join(CORPUS_DIR, f"corpus-v{version}.jsonl")
+
+
+def build_corpus(path=None, version=CORPUS_VERSION, cells=CORPUS_CELLS, per_cell=SCRAMBLES_PER_CELL):
+    """Write the seeded corpus file. Bump CORPUS_VERSION instead of changing an existing one"""
+    path = path or corpus_path(version)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        for size, depths in cells.items():
+            for depth in depths:
+                seed = version * 1_000_000 + size * 1000 + depth
+                for item in generate_scrambles(per_cell, size, depth, seed):
+                    f.write(json.dumps({'id': f"{size}-{depth}-{item['id']}", 'size': size,
+                                        'scramble': " ".join(item['scramble'])}) + "\n")
+    return path
+
+
+def load_corpus(version=CORPUS_VERSION):
+    path = corpus_path(version)
+    if not os.path.exists(path):
+        build_corpus(path, version)
+    return list(read_scrambles(path))
+
+
+def p95(values):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+
+def run_benchmark(corpus, solvers=DEFAULT_SOLVERS, budget=10.0):
+    """Per (solver, size, depth) summary of solving every scramble of the corpus"""
+    cells = {}
+    for item in corpus:
+        cells.setdefault((item['size'], len(item['scramble'])), []).append(item)
+
+    report = {}
+    for name in solvers:
+        solver = SOLVERS[name]
+        for (size, depth), items in sorted(cells.items()):
+            if name == 'Table' and size != 2:
+                continue
+            # Untimed first solve, so table loads and caches are not in the numbers
+            try:
+                with time_budget(budget):
+                    solver(scramble_state(size, items[0]['scramble']), depth)
+            except SolveTimeout:
+                pass
+            times, rates, nodes, lengths = [], [], [], []
+            timeouts = 0
+            for item in items:
+                state = scramble_state(size, item['scramble'])
+                start = time.perf_counter()
+                try:
+                    # The scramble length bounds the optimal solution
+                    with time_budget(budget):
+                        result = solver(state, depth)
+                except SolveTimeout:
+                    timeouts += 1
+                    times.append(time.perf_counter() - start)
+                    continue
+                times.append(time.perf_counter() - start)
+                rates.append(result['nodes_per_sec'])
+                nodes.append(result['nodes_expanded'])
+                if result['solution'] is not None:
+                    lengths.append(len(result['solution']))
+            report[f"{name}|{size}|{depth}"] = {
+                'solver': name, 'size': size, 'depth': depth, 'scrambles': len(items),
+                'solved': len(lengths), 'timeouts': timeouts,
+                'median_time': statistics.median(times),
+                'p95_time': p95(times),
+                'median_nodes_per_sec': statistics.median(rates) if rates else 0.0,
+                'median_nodes_expanded': statistics.median(nodes) if nodes else None,
+                'mean_solution_length': statistics.mean(lengths) if lengths else None,
+            }
+    return report
+
+
+def compare(report, baseline, tolerance=0.25, min_slowdown=0.002):
+    """Regression messages for cells that got slower, lost solves or changed results.
+
+    A slowdown must pass both the relative tolerance and `min_slowdown`
+    seconds, so that timer noise in sub-millisecond cells is not flagged.
+    """
+    regressions = []
+    for key, cell in report.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        label = f"{cell['solver']} {cell['size']}x{cell['size']}x{cell['size']} depth {cell['depth']}"
+        if cell['solved'] < old['solved']:
+            regressions.append(f"{label}: solved {cell['solved']}/{cell['scrambles']}, baseline {old['solved']}")
+        if cell['median_nodes_expanded'] != old['median_nodes_expanded']:
+            regressions.append(f"{label}: median nodes {cell['median_nodes_expanded']}, "
+                               f"baseline {old['median_nodes_expanded']}")
+        if cell['mean_solution_length'] != old['mean_solution_length']:
+            regressions.append(f"{label}: mean length {cell['mean_solution_length']}, "
+                               f"baseline {old['mean_solution_length']}")
+        if cell['median_time'] > max(old['median_time'] * (1 + tolerance), old['median_time'] + min_slowdown):
+            regressions.append(f"{label}: median time {cell['median_time'] * 1000:.2f}ms, "
+                               f"baseline {old['median_time'] * 1000:.2f}ms")
+    return regressions
+
+
+def print_report(report, baseline=None):
+    print(f"{'Solver':8} {'Cell':12} {'Solved':>8} {'Median ms':>10} {'p95 ms':>10} {'Nodes/s':>12} "
+          f"{'Nodes':>10} {'Length':>7} {'vs base':>8}")
+    for key, cell in report.items():
+        old = (baseline or {}).get(key)
+        change = f"{cell['median_time'] / old['median_time']:.2f}x" if old and old['median_time'] > 0 else "-"
+        nodes = cell['median_nodes_expanded']
+        length = cell['mean_solution_length']
+        print(f"{cell['solver']:8} {str(cell['size']) + 'x' + str(cell['size']) + ' d' + str(cell['depth']):12} "
+              f"{cell['solved']:>4}/{cell['scrambles']:<3} {cell['median_time'] * 1000:>10.2f} "
+              f"{cell['p95_time'] * 1000:>10.2f} {cell['median_nodes_per_sec']:>12,.0f} "
+              f"{nodes if nodes is not None else '-':>10} {f'{length:.2f}' if length is not None else '-':>7} "
+              f"{change:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the cube solvers on the versioned scramble corpus")
+    parser.add_argument("--solvers", nargs="*", default=list(DEFAULT_SOLVERS), choices=list(SOLVERS))
+    parser.add_argument("--corpus-version", type=int, default=CORPUS_VERSION)
+    parser.add_argument("--budget", type=float, default=10.0, help="seconds per scramble")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed median slowdown")
+    args = parser.parse_args()
+
+    report = run_benchmark(load_corpus(args.corpus_version), args.solvers, args.budget)
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            saved = json.load(f)
+        if saved['corpus_version'] == args.corpus_version:
+            baseline = saved['cells']
+        else:
+            print(f"Baseline is for corpus v{saved['corpus_version']}, not comparing")
+    print_report(report, baseline)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({'corpus_version': args.corpus_version, 'created': time.time(), 'cells': report}, f, indent=1)
+        print(f"Baseline saved to {args.baseline}")
+    elif baseline is not None:
+        regressions = compare(report, baseline, args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline")
@@ -1,100 +1,197 @@
+import contextlib
 import os
-import json
+import random
 import time
 import sys
 
 # Import cube and solver functions
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from algorithms.cube import create_solved_cube, scramble_cube
-from algorithms.solver import dfs, bfs, a_star
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from cube import create_solved_cube, scramble_cube
+from algorithms.cubesolver import (dfs, exhaustive_bfs_all_nodes as bfs, a_star, ida_star, bidirectional_bfs,
+                                   symmetry_reduction)
+from algorithms.transposition import TranspositionTable
+from algorithms.cube2_table import table_solve, load_table
+from batch_solve import ResultWriter, result_row
 
-def test_algorithms(cube_sizes=[2, 3], scramble_moves=[5, 10], algorithms=None):
-    """Test different algorithms on various cube sizes and scramble complexities"""
+# Evaluation functions whose share of each run is reported when profiling
+PROFILE_HOT = {
+    'move application': ('cube.py:move', 'cube.py:apply_move', 'cube.py:expand_batch'),
+    'goal test': ('cube.py:is_solved',),
+    'heuristic': ('patterndb.py:__call__', 'cube2_table.py:distance'),
+    'table lookup': ('transposition.py:lookup',),
+}
+
+# Uninformed searches grow as 18**depth, so DFS/BFS never search deeper than
+# this. Scrambles longer than the cap may be left unsolved by them.
+UNINFORMED_MAX_DEPTH = 5
+
+# Solvers that read their transposition table during the search. DFS would only
+# pay for lookups it never gets to write, and BFS would only write.
+TABLE_SOLVERS = ('A*', 'IDA*', 'BiBFS')
+
+# Solvers that can key their visited set by symmetry class
+SYMMETRY_SOLVERS = ('DFS', 'BFS', 'A*')
+
+def test_algorithms(cube_sizes=[2, 3], scramble_moves=[5, 10], algorithms=None, transposition_tables=None,
+                    writers=(), seed=None, profile_dir=None, symmetry=False):
+    """Test different algorithms on various cube sizes and scramble complexities
+
+    `seed` makes the scrambles repeatable. For timings worth comparing, run
+    benchmark.py, which solves a fixed corpus of many scrambles per cell.
+
+    With `profile_dir` every run is profiled (see profiling.py at the
+    repository root). Reports and collapsed stacks go to that directory, and
+    each result gets a 'profile' entry with the share of time spent in move
+    application, goal tests and heuristics.
+
+    Each result is written to every ResultWriter in `writers` as soon as it
+    finishes, so an interrupted run keeps the rows it already produced.
+
+    `transposition_tables` maps an algorithm name to its own
+    TranspositionTable, which carries what that algorithm learned into later
+    cells (and runs, if saved). Only TABLE_SOLVERS get one. Algorithms never
+    share a table, or the later ones in a cell would just read back the
+    earlier ones' solution.
+
+    With `symmetry` each of SYMMETRY_SOLVERS is also run once plain and once
+    with symmetry-class keys (without a transposition table, so both runs
+    start cold). Its result gets a 'symmetry_reduction' entry with the
+    visited-set and nodes-expanded reduction factors. Canonicalizing costs
+    more than most small searches save, so this is for measuring, not speed.
+
+    2x2x2 cells also run the complete distance table ('Table') after the
+    searches. It solves without searching, and its distance checks every
+    other solver's solution length.
+    """
     if algorithms is None:
         algorithms = {
             'DFS': dfs,
             'BFS': bfs,
-            'A*': a_star
+            'A*': a_star,
+            'IDA*': ida_star,
+            'BiBFS': bidirectional_bfs
         }
     
     results = {}
+    rng = random.Random(seed) if seed is not None else random
+    profiler = None
+    if profile_dir is not None:
+        sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+        from profiling import Profiler, format_shares
+        profiler = Profiler(profile_dir, PROFILE_HOT)
     
     for size in cube_sizes:
         results[size] = {}
         for scramble_depth in scramble_moves:
             print(f"Testing cube size {size}x{size}x{size} with {scramble_depth} scramble moves")
             solved_cube = create_solved_cube(size)
-            scrambled_cube, scramble_sequence = scramble_cube(solved_cube, scramble_depth)
+            scrambled_cube, scramble_sequence = scramble_cube(solved_cube, scramble_depth, rng)
             
             results[size][scramble_depth] = {}
+            cell_algorithms = dict(algorithms)
+            optimal_length = None
+            if size == 2:
+                # Runs last and without the transposition table, so it cannot hand its answer to the searches
+                cell_algorithms = {**algorithms, 'Table': table_solve}
+                optimal_length = load_table().distance(scrambled_cube)
             
-            for alg_name, alg_func in algorithms.items():
+            for alg_name, alg_func in cell_algorithms.items():
                 print(f"  Running {alg_name}...")
                 
-                # For larger cubes and complex scrambles, limit DFS/BFS depth
+                # DFS/BFS stop at the scramble length, which bounds the
+                # solution, or at UNINFORMED_MAX_DEPTH if that is lower
                 max_depth = min(10, scramble_depth + 2)
-                if size > 3 and alg_name in ['DFS', 'BFS']:
-                    max_depth = min(5, scramble_depth)
+                if alg_name in ['DFS', 'BFS']:
+                    max_depth = min(UNINFORMED_MAX_DEPTH, scramble_depth)
                 
-                result = alg_func(scrambled_cube, max_depth)
+                label = f"{size}x{size}x{size}-d{scramble_depth}-{alg_name}"
+                with profiler.profile(label) if profiler is not None else contextlib.nullcontext():
+                    table = None
+                    if transposition_tables and alg_name in TABLE_SOLVERS:
+                        table = transposition_tables.get(alg_name)
+                    if table is not None:
+                        result = alg_func(scrambled_cube, max_depth, table=table)
+                    else:
+                        result = alg_func(scrambled_cube, max_depth)
+                if profiler is not None:
+                    result['profile'] = profiler.shares(label)
+                reduction_fields = {}
+                if symmetry and alg_name in SYMMETRY_SOLVERS:
+                    reduction = symmetry_reduction(alg_func, scrambled_cube, max_depth=max_depth)
+                    result['symmetry_reduction'] = {key: value for key, value in reduction.items()
+                                                    if key not in ('plain', 'symmetry')}
+                    reduction_fields = {f"symmetry_{key}": value
+                                        for key, value in result['symmetry_reduction'].items()}
                 results[size][scramble_depth][alg_name] = result
+                if optimal_length is not None and result['solution'] is not None:
+                    result['optimal'] = len(result['solution']) == optimal_length
+                row = result_row(result, size=size, scramble_depth=scramble_depth,
+                                 scramble=" ".join(scramble_sequence), algorithm=alg_name, **reduction_fields)
+                for writer in writers:
+                    writer.write(row)
                 
-                print(f"    {'Solved' if result['solution'] else 'Not solved'} - "
+                table_info = f", TT hits: {result['tt_hit_rate']:.1%}" if 'tt_hit_rate' in result else ""
+                if result.get('optimal') is False:
+                    table_info += f", {len(result['solution'])} moves (optimal is {optimal_length})"
+                print(f"    {'Solved' if result['solution'] is not None else 'Not solved'} - "
                       f"Nodes: {result['nodes_expanded']}, "
                       f"Time: {result['time_taken']:.2f}s, "
-                      f"Memory: {result['max_memory']:.2f}MB")
+                      f"Memory: {result['max_memory']:.2f}MB{table_info}")
+                if profiler is not None:
+                    print(f"    Profile: {format_shares(result['profile'])}")
+                if 'symmetry_reduction' in result:
+                    reduction = result['symmetry_reduction']
+                    print(f"    Symmetry: visited {reduction['visited_reduction']:.2f}x smaller, "
+                          f"nodes {reduction['nodes_reduction']:.2f}x fewer, "
+                          f"time {reduction['time_ratio']:.2f}x, "
+                          f"{'same' if reduction['same_length'] else 'different'} solution length")
     
+    if profiler is not None:
+        print(f"Profiles written to {profiler.write_summary()}")
     return results
 
 def create_time_comparison_table(results):
     """Create a table comparing execution times of algorithms"""
     print("\n=== TIME COMPARISON TABLE (seconds) ===")
-    print(f"{'Cube Size':10} {'Scramble':10} {'DFS':10} {'BFS':10} {'A*':10}")
-    print("-" * 55)
-    
+    algorithms = []
     for size in results:
         for depth in results[size]:
-            dfs_time = results[size][depth]['DFS']['time_taken']
-            bfs_time = results[size][depth]['BFS']['time_taken']
-            astar_time = results[size][depth]['A*']['time_taken']
-            
-            print(f"{size}x{size}x{size:<10} {depth:<10} {dfs_time:<10.4f} {bfs_time:<10.4f} {astar_time:<10.4f}")
-
-def save_results_to_csv(results, filename="results/time_comparison.csv"):
-    """Save detailed results to CSV for report"""
-    # Create the directory if it doesn't exist
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
+            algorithms.extend(alg for alg in results[size][depth] if alg not in algorithms)
+    print(f"{'Cube Size':10} {'Scramble':10} " + " ".join(f"{alg:10}" for alg in algorithms))
+    print("-" * (22 + 11 * len(algorithms)))
     
-    with open(filename, "w") as f:
-        f.write("Cube Size,Scramble Depth,Algorithm,Time (s),Nodes Expanded,Memory (MB),Solution Found\n")
-        
-        for size in results:
-            for depth in results[size]:
-                for alg in results[size][depth]:
-                    r = results[size][depth][alg]
-                    solution_found = "Yes" if r['solution'] is not None else "No"
-                    f.write(f"{size},{depth},{alg},{r['time_taken']:.4f},{r['nodes_expanded']},{r['max_memory']:.4f},{solution_found}\n")
+    for size in results:
+        for depth in results[size]:
+            cell = results[size][depth]
+            times = " ".join(f"{cell[alg]['time_taken']:<10.4f}" if alg in cell else f"{'-':10}" for alg in algorithms)
+            print(f"{size}x{size}x{size:<10} {depth:<10} {times}")
 
 if __name__ == "__main__":
     # Define test parameters - start small for testing
     cube_sizes = [2, 3]  # Add 4, 5, 6 for full testing later
     scramble_depths = [3, 5]  # Start with small values
     
-    # Run the tests
+    # Run the tests, reusing the distances learned by previous runs
+    # (python cube-main.py --profile also writes per-run profiles, and
+    # --symmetry reports the symmetry reduction factors)
     print("Starting Rubik's Cube solver tests...")
-    results = test_algorithms(cube_sizes, scramble_depths)
-    
-    # Save results
-    os.makedirs("results", exist_ok=True)
-    with open("results/algorithm_comparison.json", "w") as f:
-        json.dump(results, f, default=str)  # Use default=str for non-serializable objects
+    profile_dir = "results/profiles" if "--profile" in sys.argv else None
+    # One table per algorithm, so each reuses only what it learned itself
+    table_files = {alg: f"results/transposition_tables/{alg.replace('*', '-star')}.pkl"
+                   for alg in TABLE_SOLVERS}
+    tables = {alg: TranspositionTable.load(path) for alg, path in table_files.items()}
+    # Rows are streamed to the CSV (for the report) and JSONL files while the tests run
+    with ResultWriter("results/time_comparison.csv") as csv_writer, \
+            ResultWriter("results/algorithm_comparison.jsonl") as jsonl_writer:
+        results = test_algorithms(cube_sizes, scramble_depths, transposition_tables=tables,
+                                  writers=(csv_writer, jsonl_writer), profile_dir=profile_dir,
+                                  symmetry="--symmetry" in sys.argv)
+    for alg, path in table_files.items():
+        tables[alg].save(path)
     
     # Display time comparison table
     create_time_comparison_table(results)
     
-    # Save detailed results to CSV
-    save_results_to_csv(results)
-    
     # Generate visualizations
     from visual.display import visualize_results
     visualize_results(results)
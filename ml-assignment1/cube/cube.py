@@ -1,5 +1,10 @@
 import random
 import copy
+from functools import lru_cache
+from itertools import permutations, product
+from operator import itemgetter
+
+import numpy as np
 
 FACE_COLORS = {
   'U': 'W',
@@ -10,6 +15,27 @@ FACE_COLORS = {
   'R': 'R',
 }
 
+FACES = list(FACE_COLORS)
+COLORS = list(FACE_COLORS.values())
+
+# Outward normal, then the "right" and "down" directions of each face as seen
+# from outside the cube. Sticker (row, col) of a face sits at
+# normal * n + right * (2 * col - n + 1) + down * (2 * row - n + 1).
+FACE_AXES = {
+  'U': ((0, 1, 0), (1, 0, 0), (0, 0, 1)),
+  'D': ((0, -1, 0), (1, 0, 0), (0, 0, -1)),
+  'F': ((0, 0, 1), (1, 0, 0), (0, -1, 0)),
+  'B': ((0, 0, -1), (-1, 0, 0), (0, -1, 0)),
+  'L': ((-1, 0, 0), (0, 0, 1), (0, -1, 0)),
+  'R': ((1, 0, 0), (0, 0, -1), (0, -1, 0)),
+}
+
+# Face turn metric: quarter turn, half turn and inverse quarter turn per face
+TURN_SUFFIXES = {1: "", 2: "2", 3: "'"}
+
+# Opposite faces turn independent layers, so R L and L R reach the same state
+OPPOSITE_FACES = {'R': 'L', 'L': 'R', 'U': 'D', 'D': 'U', 'F': 'B', 'B': 'F'}
+
 def create_solved_cube(size=3):
     return {face: [[color] * size for _ in range(size)] for face, color in FACE_COLORS.items()}
 
@@ -17,39 +43,310 @@ def rotate_face_clockwise(face):
     # Rotates a 2D face (list of lists) clockwise
     return [list(row) for row in zip(*face[::-1])]
 
+# --- Compact state -----------------------------------------------------------
+# A state is a bytes object with one color index per sticker, faces in FACES
+# order and each face stored row by row. It hashes fast and takes 6*n*n bytes.
+
+def cube_to_state(cube):
+    if isinstance(cube, bytes):
+        return cube
+    return bytes(COLORS.index(color) for face in FACES for row in cube[face] for color in row)
+
+def state_size(state):
+    return round((len(state) // 6) ** 0.5)
+
+def state_to_cube(state):
+    size = state_size(state)
+    stickers = size * size
+    cube = {}
+    for f, face in enumerate(FACES):
+        base = f * stickers
+        cube[face] = [[COLORS[state[base + r * size + c]] for c in range(size)] for r in range(size)]
+    return cube
+
+def is_solved(cube):
+    """Every face shows a single color (in any orientation of the cube)"""
+    state = cube_to_state(cube)
+    stickers = len(state) // 6
+    for base in range(0, len(state), stickers):
+        if state.count(state[base], base, base + stickers) != stickers:
+            return False
+    return True
+
+# --- Sticker geometry --------------------------------------------------------
+
+def _cross(a, b):
+    return (a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0])
+
+def _dot(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+def _turn(v, axis):
+    # Quarter turn of v, clockwise when looking down `axis` from outside
+    k = _dot(axis, v)
+    c = _cross(axis, v)
+    return (axis[0] * k - c[0], axis[1] * k - c[1], axis[2] * k - c[2])
+
+@lru_cache(maxsize=None)
+def sticker_geometry(size):
+    """(position, normal) of every sticker, in state order"""
+    geometry = []
+    for face in FACES:
+        normal, right, down = FACE_AXES[face]
+        for row in range(size):
+            for col in range(size):
+                u, v = 2 * col - size + 1, 2 * row - size + 1
+                position = tuple(normal[i] * size + right[i] * u + down[i] * v for i in range(3))
+                geometry.append((position, normal))
+    return geometry
+
+def _permutation(size, transform, selected=lambda position, normal: True):
+    """Gather permutation (new[i] = old[perm[i]]) of a rigid motion of some stickers"""
+    geometry = sticker_geometry(size)
+    index = {sticker: i for i, sticker in enumerate(geometry)}
+    perm = list(range(len(geometry)))
+    for i, (position, normal) in enumerate(geometry):
+        if selected(position, normal):
+            perm[index[(transform(position), transform(normal))]] = i
+    return tuple(perm)
+
+def compose(first, second):
+    """Permutation that applies `first` and then `second`"""
+    return tuple(first[i] for i in second)
+
+def inverse_permutation(perm):
+    inverse = [0] * len(perm)
+    for i, j in enumerate(perm):
+        inverse[j] = i
+    return tuple(inverse)
+
+@lru_cache(maxsize=None)
+def move_permutations(size):
+    """Name -> gather permutation for every outer face turn (R, R2, R', ...)"""
+    perms = {}
+    for face in "RUFLBD":
+        axis = FACE_AXES[face][0]
+        quarter = _permutation(size, lambda v: _turn(v, axis),
+                               lambda position, normal: _dot(position, axis) >= size - 1)
+        perm = quarter
+        for turns in (1, 2, 3):
+            perms[face + TURN_SUFFIXES[turns]] = perm
+            perm = compose(perm, quarter)
+    return perms
+
+def _permuter(perm):
+    gather = itemgetter(*perm)
+
+    def move(state):
+        return bytes(gather(state))
+    return move
+
+@lru_cache(maxsize=None)
+def face_turns(size):
+    """(move_name, function) pairs that map a compact state to its successor"""
+    return [(name, _permuter(perm)) for name, perm in move_permutations(size).items()]
+
+def is_redundant_pair(previous_face, face):
+    """Whether `face` after `previous_face` can be skipped without losing solutions.
+
+    Two turns of the same face merge into one, and of two commuting opposite
+    faces only the order R before L, U before D, F before B is kept.
+    """
+    if previous_face is None:
+        return False
+    if face == previous_face:
+        return True
+    return OPPOSITE_FACES[face] == previous_face and face in "RUF"
+
+def apply_move(state, move_name):
+    perm = move_permutations(state_size(state))[move_name]
+    return bytes(state[i] for i in perm)
+
+@lru_cache(maxsize=None)
+def move_index_array(size):
+    """(moves, stickers) gather indices of the face turns, in face_turns order"""
+    return np.array(list(move_permutations(size).values()), dtype=np.intp)
+
+def states_to_array(states):
+    """Stack compact states into a (k, 6*n*n) uint8 array"""
+    return np.frombuffer(b"".join(states), dtype=np.uint8).reshape(len(states), -1)
+
+def expand_batch(states, size=None):
+    """Every child of a (k, 6*n*n) uint8 frontier in one fancy-indexing pass.
+
+    Row i * moves + m is state i after move m, which is the order a serial
+    BFS generates children in.
+    """
+    perms = move_index_array(size or state_size(states[0]))
+    return states[:, perms].reshape(-1, states.shape[1])
+
+def iter_children(states, size=None, chunk=4096):
+    """Children of a list of compact states as bytes, in serial BFS order.
+
+    Parents go through expand_batch `chunk` at a time, so a large frontier
+    never has all of its children in one array.
+    """
+    if not states:
+        return
+    size = size or state_size(states[0])
+    record_size = len(states[0])
+    for start in range(0, len(states), chunk):
+        children = expand_batch(states_to_array(states[start:start + chunk]), size).tobytes()
+        for offset in range(0, len(children), record_size):
+            yield children[offset:offset + record_size]
+
+def pack_states(states):
+    """One opaque key per row: two 4-bit stickers per byte.
+
+    Keys sort in the same order as the unpacked bytes, so sorted keys give
+    sorted states.
+    """
+    packed = np.ascontiguousarray((states[:, 0::2] << 4) | states[:, 1::2])
+    return packed.view(np.dtype((np.void, packed.shape[1]))).ravel()
+
+def unique_states(states):
+    """Sorted, deduplicated rows of a state array"""
+    _, first = np.unique(pack_states(states), return_index=True)
+    return states[first]
+
+def inverse_move(move_name):
+    face, suffix = move_name[0], move_name[1:]
+    return face + {"": "'", "2": "2", "'": ""}[suffix]
+
+@lru_cache(maxsize=None)
+def cube_rotations(size):
+    """Gather permutations of the 24 whole-cube rotations (identity first)"""
+    identity = tuple(range(6 * size * size))
+    x_turn = _permutation(size, lambda v: _turn(v, (1, 0, 0)))
+    y_turn = _permutation(size, lambda v: _turn(v, (0, 1, 0)))
+    rotations = [identity]
+    seen = {identity}
+    for perm in rotations:
+        for generator in (x_turn, y_turn):
+            successor = compose(perm, generator)
+            if successor not in seen:
+                seen.add(successor)
+                rotations.append(successor)
+    return rotations
+
+def goal_states(size):
+    """Every compact state that is_solved accepts and face turns can reach.
+
+    Only a 2x2x2 has no fixed centres, so it is also solved in any of the
+    24 whole-cube orientations; larger cubes have a single goal.
+    """
+    solved = cube_to_state(create_solved_cube(size))
+    if size != 2:
+        return [solved]
+    return sorted({bytes(solved[i] for i in perm) for perm in cube_rotations(size)})
+
+def _matrix_transform(matrix):
+    return lambda v: tuple(_dot(row, v) for row in matrix)
+
+@lru_cache(maxsize=None)
+def cube_symmetries(size):
+    """The 48 spatial symmetries (24 rotations, each with or without a mirror).
+
+    Each entry is (sticker_perm, color_table, move_map). A symmetric twin of
+    a state is bytes(state[i] for i in sticker_perm).translate(color_table):
+    the stickers move with the symmetry and are recolored so the solved cube
+    maps to itself. move_map relabels a move on the state to the matching
+    move on its twin; a mirror turns clockwise into counterclockwise.
+    The identity comes first.
+    """
+    normals = [FACE_AXES[face][0] for face in FACES]
+    symmetries = []
+    for axes in permutations(range(3)):
+        for signs in product((1, -1), repeat=3):
+            matrix = tuple(tuple(signs[r] if c == axes[r] else 0 for c in range(3)) for r in range(3))
+            transform = _matrix_transform(matrix)
+            determinant = _dot(matrix[0], _cross(matrix[1], matrix[2]))
+            face_map = {face: FACES[normals.index(transform(normals[f]))] for f, face in enumerate(FACES)}
+            color_table = bytes(FACES.index(face_map[FACES[c]]) if c < len(FACES) else c for c in range(256))
+            move_map = {}
+            for name in move_permutations(size):
+                turns = {"": 1, "2": 2, "'": 3}[name[1:]]
+                if determinant < 0:
+                    turns = 4 - turns
+                move_map[name] = face_map[name[0]] + TURN_SUFFIXES[turns]
+            symmetries.append((_permutation(size, transform), color_table, move_map))
+    identity = tuple(range(6 * size * size))
+    symmetries.sort(key=lambda symmetry: symmetry[0] != identity)
+    return symmetries
+
+@lru_cache(maxsize=None)
+def _symmetry_appliers(size):
+    return [(itemgetter(*perm), color_table) for perm, color_table, _ in cube_symmetries(size)]
+
+@lru_cache(maxsize=None)
+def _inverse_symmetries(size):
+    perms = [perm for perm, _, _ in cube_symmetries(size)]
+    return [perms.index(inverse_permutation(perm)) for perm in perms]
+
+def symmetric_states(state):
+    """The 48 symmetric twins of a compact state, in cube_symmetries order"""
+    return [bytes(gather(state)).translate(color_table) for gather, color_table in _symmetry_appliers(state_size(state))]
+
+def canonicalize(state):
+    """(representative, symmetry index, class size) of a state's symmetry class.
+
+    The representative is the smallest twin, so all 48 twins of a state map to
+    the same key. Solving the representative and passing the solution through
+    relabel_moves(moves, index, inverse=True) solves the original state.
+    """
+    twins = symmetric_states(state)
+    representative = min(twins)
+    return representative, twins.index(representative), len(set(twins))
+
+def relabel_moves(moves, symmetry_index, size=3, inverse=False):
+    """Map moves on a state to the matching moves on its symmetric twin (or back)"""
+    if inverse:
+        symmetry_index = _inverse_symmetries(size)[symmetry_index]
+    move_map = cube_symmetries(size)[symmetry_index][2]
+    return [move_map[name] for name in moves]
+
+@lru_cache(maxsize=None)
+def corner_stickers(size):
+    """Sticker indices of the 8 corner slots.
+
+    Each slot lists its U/D sticker first, followed by the other two in a
+    fixed rotational order, so a corner twist is a cyclic shift of the slot.
+    """
+    geometry = sticker_geometry(size)
+    slots = {}
+    for i, (position, normal) in enumerate(geometry):
+        cubie = tuple(position[k] - normal[k] for k in range(3))
+        if all(abs(c) == size - 1 for c in cubie):
+            slots.setdefault(cubie, []).append((normal, i))
+    corners = []
+    for cubie in sorted(slots):
+        stickers = sorted(slots[cubie], key=lambda s: s[0][1] == 0)
+        (n0, i0), (n1, i1), (n2, i2) = stickers
+        if _dot(_cross(n0, n1), n2) < 0:
+            i1, i2 = i2, i1
+        corners.append((i0, i1, i2))
+    return corners
+
+def _move_cube(cube, move_name):
+    return state_to_cube(apply_move(cube_to_state(cube), move_name))
+
 def move_R (cube):
-    new_cube = copy.deepcopy(cube)
-    new_cube['R'] = rotate_face_clockwise(new_cube['R'])
-    return new_cube
+    return _move_cube(cube, "R")
 
 def move_U(cube):
-    new_cube = copy.deepcopy(cube)
-    new_cube['U'] = rotate_face_clockwise(new_cube['U'])
-    return new_cube
+    return _move_cube(cube, "U")
 
 def move_F(cube):
-    new_cube = copy.deepcopy(cube)
-    new_cube['F'] = rotate_face_clockwise(new_cube['F'])
-    return new_cube
+    return _move_cube(cube, "F")
 
 def move_L(cube):
-    new_cube = copy.deepcopy(cube)
-    new_cube['L'] = rotate_face_clockwise(new_cube['L'])
-    return new_cube
+    return _move_cube(cube, "L")
 
 def move_B(cube):
-    new_cube = copy.deepcopy(cube)
-    new_cube['B'] = rotate_face_clockwise(new_cube['B'])
-    new_cube['B'] = rotate_face_clockwise(new_cube['B'])
-    return new_cube
+    return _move_cube(cube, "B")
 
 def move_D(cube):
-    new_cube = copy.deepcopy(cube)
-    new_cube['D'] = rotate_face_clockwise(new_cube['D'])
-    return new_cube
-
-def rotate_face_clockwise(face):
-    return [list(row) for row in zip(*face[::-1])]
+    return _move_cube(cube, "D")
 
 all_moves = [
     (move_R, "R"),
@@ -60,11 +357,12 @@ all_moves = [
     (move_D, "D"),
 ]
 
-def scramble_cube(cube, num_moves=20):
+def scramble_cube(cube, num_moves=20, rng=random):
+    """Random clockwise turns; pass rng=random.Random(seed) for a repeatable scramble"""
     scrambled_cube = copy.deepcopy(cube)
     scramble_sequence = []
     for _ in range(num_moves):
-        move_func, move_name = random.choice(all_moves)
+        move_func, move_name = rng.choice(all_moves)
         cube = move_func(cube)
         scramble_sequence.append(move_name)
     return cube, scramble_sequence
@@ -0,0 +1,103 @@
+"""Load generator for solver_daemon.py.
+
+Opens --concurrency connections and keeps one request outstanding on each
+until --requests have been answered. The mix is seeded cube scrambles and
+N-queens boards. Prints client-side latency percentiles and throughput,
+then the daemon's own stats.
+
+    python solver_daemon.py &
+    python daemon_load.py --requests 2000 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from batch_solve import generate_scrambles
+from solver_daemon import DEFAULT_SOCKET, open_connection, percentile
+
+
+def request_mix(count, cube_sizes=(2, 3), depth=6, queens=(16, 32, 64), nqueens_share=0.2, deadline=5.0, seed=0):
+    """Seeded stream of cube and N-queens requests"""
+    rng = random.Random(seed)
+    scrambles = {size: generate_scrambles(count, size, depth, seed) for size in cube_sizes}
+    for request_id in range(count):
+        if rng.random() < nqueens_share:
+            yield {'id': request_id, 'type': 'nqueens', 'n': rng.choice(queens), 'algorithm': 'annealing',
+                   'deadline': deadline}
+        else:
+            size = rng.choice(cube_sizes)
+            item = next(scrambles[size])
+            yield {'id': request_id, 'type': 'cube', 'size': size, 'scramble': " ".join(item['scramble']),
+                   'algorithm': 'Table' if size == 2 else 'IDA*', 'deadline': deadline}
+
+
+def milliseconds(seconds):
+    return f"{seconds * 1000:.1f}ms" if seconds is not None else "-"
+
+
+async def call(reader, writer, request):
+    writer.write((json.dumps(request) + "\n").encode())
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+async def run_load(requests, concurrency=16, socket_path=DEFAULT_SOCKET, port=None):
+    requests = iter(requests)
+    latencies = []
+    statuses = {}
+
+    async def client():
+        reader, writer = await open_connection(socket_path, port=port)
+        try:
+            for request in requests:
+                sent = time.time()
+                response = await call(reader, writer, request)
+                latencies.append(time.time() - sent)
+                statuses[response['status']] = statuses.get(response['status'], 0) + 1
+        finally:
+            writer.close()
+
+    start = time.time()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.time() - start
+
+    reader, writer = await open_connection(socket_path, port=port)
+    server_stats = await call(reader, writer, {'id': 'stats', 'type': 'stats'})
+    writer.close()
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'time_taken': elapsed,
+        'throughput': len(latencies) / elapsed if elapsed > 0 else 0.0,
+        'latency_p50': percentile(latencies, 0.50),
+        'latency_p99': percentile(latencies, 0.99),
+        'statuses': statuses,
+        'server': server_stats,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Send a seeded request mix to a running solver daemon")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--depth", type=int, default=6, help="cube scramble length")
+    parser.add_argument("--nqueens-share", type=float, default=0.2)
+    parser.add_argument("--deadline", type=float, default=5.0, help="seconds per request")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    mix = request_mix(args.requests, depth=args.depth, nqueens_share=args.nqueens_share,
+                      deadline=args.deadline, seed=args.seed)
+    summary = asyncio.run(run_load(mix, args.concurrency, args.socket, args.port))
+    print(f"{summary['requests']} requests in {summary['time_taken']:.2f}s "
+          f"({summary['throughput']:.1f}/s), p50 {milliseconds(summary['latency_p50'])}, "
+          f"p99 {milliseconds(summary['latency_p99'])}, statuses {summary['statuses']}")
+    server = summary['server']
+    print(f"daemon: {server['completed']} completed, queue depth {server['queue_depth']}, "
+          f"p50 {milliseconds(server['latency_p50'])}, p99 {milliseconds(server['latency_p99'])}, "
+          f"{server['throughput']:.1f}/s over the last minute")
@@ -0,0 +1,339 @@
+"""Local solver daemon that keeps the tables loaded between requests.
+
+Starting cube-main.py or nqueens_solver.py pays for imports and table loads
+every time, which is far more than an easy solve costs. The daemon pays
+that once. Worker processes are started with the move tables, pattern
+databases and the 2x2x2 distance table already loaded, and requests reach
+them over a Unix socket (or localhost TCP port).
+
+The protocol is one JSON object per line, answered by one JSON line carrying
+the same 'id'. Requests on a connection may be pipelined:
+
+    {"id": 1, "type": "cube", "size": 3, "scramble": "R U F'", "algorithm": "IDA*", "deadline": 2.0}
+    {"id": 2, "type": "nqueens", "n": 64, "algorithm": "annealing", "deadline": 5.0}
+    {"id": 3, "type": "nqueens", "n": 65, "algorithm": "repair", "board": [...]}
+    {"id": 4, "type": "stats"}
+
+Requests wait in a queue. A dispatcher drains whatever is waiting (up to
+--batch-size requests) and sends it to a worker as one task, so a burst of
+small solves costs one round trip instead of one per request. The worker
+posts each response back as soon as that request is done, so a slow solve
+does not hold back the rest of its batch. 'deadline' is in seconds from
+arrival. A request still queued when its deadline passes is answered with
+status 'deadline' at that moment and never sent to a worker. A request
+already sent to a worker is answered with status 'timeout' when its deadline
+passes, and the worker cuts the solve off.
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import logging
+import itertools
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                             "ml-assignmentN-queensProblem"))
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET = "/tmp/cube-solver.sock"
+LATENCY_WINDOW = 10000
+THROUGHPUT_WINDOW = 60.0
+
+NQUEENS_SOLVERS = {
+    'dfs': lambda solver, budget, request: solver.solve_exhaustive_dfs(timeout_seconds=budget or 300),
+    'hill_climbing': lambda solver, budget, request: solver.solve_greedy_hill_climbing(),
+    'annealing': lambda solver, budget, request: solver.solve_simulated_annealing(),
+    'genetic': lambda solver, budget, request: solver.solve_genetic_algorithm(),
+    # Needs 'board': a previous solution, a perturbed board or a board for a nearby N
+    'repair': lambda solver, budget, request: solver.solve_warm_start(request['board']),
+}
+
+
+# Worker side: runs in the pool processes
+
+_responses = None
+
+
+def _warm_worker(cube_sizes, responses=None):
+    """Pool initializer: do every import and table load before the first request.
+
+    `responses` is the daemon's queue for answers sent back one at a time.
+    """
+    global _responses
+    _responses = responses
+    import nqueens_solver  # noqa: F401  (numpy/psutil imports)
+    _load_tables(cube_sizes)
+
+
+def _load_tables(cube_sizes):
+    from cube import face_turns
+    from algorithms.patterndb import load_heuristic
+    from algorithms.cube2_table import load_table
+    for size in cube_sizes:
+        face_turns(size)
+        load_heuristic(size)
+        if size == 2:
+            load_table()
+
+
+def _solve_cube(request, budget):
+    from batch_solve import SOLVERS, check_solver_size, scramble_state, result_row, time_budget
+    algorithm = request.get('algorithm', 'IDA*')
+    size = int(request.get('size', 3))
+    check_solver_size(algorithm, size)
+    moves = request['scramble'].split() if isinstance(request['scramble'], str) else request['scramble']
+    state = scramble_state(size, moves)
+    with time_budget(budget):
+        result = SOLVERS[algorithm](state, int(request.get('max_depth', 20)))
+    return result_row(result, algorithm=algorithm)
+
+
+def _solve_nqueens(request, budget):
+    from batch_solve import time_budget
+    from nqueens_solver import OptimizedNQueensSolver
+    algorithm = request.get('algorithm', 'annealing')
+    solver = OptimizedNQueensSolver(int(request['n']))
+    with time_budget(budget):
+        solution, stats = NQUEENS_SOLVERS[algorithm](solver, budget, request)
+    return {'algorithm': algorithm, 'status': 'solved' if solution is not None else 'unsolved',
+            'solution': [int(col) for col in solution] if solution is not None else None,
+            **{key: value.item() if hasattr(value, 'item') else value for key, value in stats.items()}}
+
+
+def _solve_requests(requests):
+    """Solve a batch of (key, request, absolute deadline) in one worker, in order.
+
+    Each response is also posted to the daemon's queue as soon as it is done.
+    """
+    from batch_solve import SolveTimeout
+    handlers = {'cube': _solve_cube, 'nqueens': _solve_nqueens}
+    responses = []
+    for key, request, deadline in requests:
+        start = time.time()
+        budget = deadline - start if deadline is not None else None
+        try:
+            if budget is not None and budget <= 0:
+                response = {'status': 'deadline'}
+            else:
+                response = handlers[request['type']](request, budget)
+        except SolveTimeout:
+            response = {'status': 'timeout'}
+        except Exception as error:
+            response = {'status': 'error', 'error': repr(error)}
+        response['solve_time'] = time.time() - start
+        response['worker'] = os.getpid()
+        if _responses is not None:
+            _responses.put((key, response))
+        responses.append(response)
+    return responses
+
+
+# Daemon side: one asyncio event loop
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class SolverDaemon:
+
+    def __init__(self, workers=None, batch_size=8, cube_sizes=(2, 3)):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.cube_sizes = tuple(cube_sizes)
+        self.queue = asyncio.Queue()
+        self.slots = asyncio.Semaphore(self.workers)
+        self.pool = None
+        self.responses = None
+        self.keys = itertools.count()
+        self.pending = {}  # key -> (waiter, deadline timer or None)
+        self.dispatched = set()
+        self.started = time.time()
+        self.in_flight = 0
+        self.completed = 0
+        self.statuses = {}
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.finish_times = deque()
+
+    def stats(self):
+        now = time.time()
+        while self.finish_times and now - self.finish_times[0] > THROUGHPUT_WINDOW:
+            self.finish_times.popleft()
+        window = min(THROUGHPUT_WINDOW, now - self.started)
+        latencies = sorted(self.latencies)
+        return {
+            'status': 'ok',
+            'uptime': now - self.started,
+            'workers': self.workers,
+            'queue_depth': self.queue.qsize(),
+            'in_flight': self.in_flight,
+            'completed': self.completed,
+            'statuses': dict(self.statuses),
+            'latency_p50': percentile(latencies, 0.50),
+            'latency_p99': percentile(latencies, 0.99),
+            'throughput': len(self.finish_times) / window if window > 0 else 0.0,
+        }
+
+    async def dispatch(self):
+        """Move queued requests to the pool in batches, at most one batch per worker"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            await self.slots.acquire()
+            # More requests may have arrived while every worker was busy
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            # Requests whose deadline passed in the queue were answered already
+            batch = [entry for entry in batch if entry[0] in self.pending]
+            if not batch:
+                self.slots.release()
+                continue
+            self.dispatched.update(key for key, _, _ in batch)
+            self.in_flight += len(batch)
+            future = loop.run_in_executor(self.pool, _solve_requests, batch)
+            future.add_done_callback(lambda done, batch=batch: self._finish_batch(batch, done))
+
+    def _expire(self, key):
+        self._deliver(key, {'status': 'timeout' if key in self.dispatched else 'deadline'})
+
+    def _deliver(self, key, response):
+        self.dispatched.discard(key)
+        waiter, timer = self.pending.pop(key, (None, None))
+        if timer is not None:
+            timer.cancel()
+        if waiter is not None and not waiter.done():
+            waiter.set_result(response)
+
+    def _read_responses(self, loop):
+        """Thread: hand responses posted by the workers to the event loop"""
+        while (item := self.responses.get()) is not None:
+            loop.call_soon_threadsafe(self._deliver, *item)
+
+    def _finish_batch(self, batch, done):
+        self.slots.release()
+        self.in_flight -= len(batch)
+        if done.exception() is not None:
+            responses = [{'status': 'error', 'error': repr(done.exception())} for _ in batch]
+        else:
+            responses = done.result()
+        # Normally every response came through the queue already
+        for (key, _, _), response in zip(batch, responses):
+            self._deliver(key, response)
+
+    async def handle_request(self, request):
+        arrived = time.time()
+        if request.get('type') == 'stats':
+            return self.stats()
+        if request.get('type') not in ('cube', 'nqueens'):
+            return {'status': 'error', 'error': f"unknown request type {request.get('type')!r}"}
+        deadline = arrived + float(request['deadline']) if request.get('deadline') else None
+        loop = asyncio.get_running_loop()
+        key = next(self.keys)
+        timer = None
+        if deadline is not None:
+            timer = loop.call_later(deadline - arrived, self._expire, key)
+        waiter = loop.create_future()
+        self.pending[key] = (waiter, timer)
+        await self.queue.put((key, request, deadline))
+        response = await waiter
+        latency = time.time() - arrived
+        response['latency'] = latency
+        self.completed += 1
+        self.statuses[response['status']] = self.statuses.get(response['status'], 0) + 1
+        self.latencies.append(latency)
+        self.finish_times.append(time.time())
+        return response
+
+    async def handle_connection(self, reader, writer):
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def answer(line):
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise TypeError(f"a request must be a JSON object, not {type(request).__name__}")
+                response = await self.handle_request(request)
+                response['id'] = request.get('id')
+            except (ValueError, KeyError, TypeError) as error:
+                response = {'status': 'error', 'error': repr(error)}
+            async with write_lock:
+                writer.write((json.dumps(response) + "\n").encode())
+                await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(answer(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path=DEFAULT_SOCKET, host=None, port=None):
+        # Missing tables are built here once, not by every worker at the same time
+        await asyncio.get_running_loop().run_in_executor(None, _load_tables, self.cube_sizes)
+        self.responses = multiprocessing.Queue()
+        threading.Thread(target=self._read_responses, args=(asyncio.get_running_loop(),), daemon=True).start()
+        self.pool = concurrent.futures.ProcessPoolExecutor(self.workers, initializer=_warm_worker,
+                                                           initargs=(self.cube_sizes, self.responses))
+        # Start every worker now so the first requests do not pay for the warm-up
+        await asyncio.gather(*(asyncio.get_running_loop().run_in_executor(self.pool, _solve_requests, [])
+                               for _ in range(self.workers)))
+        if port is not None:
+            server = await asyncio.start_server(self.handle_connection, host or "127.0.0.1", port)
+            address = f"{host or '127.0.0.1'}:{port}"
+        else:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            server = await asyncio.start_unix_server(self.handle_connection, socket_path)
+            address = socket_path
+        logger.info("solver daemon listening on %s with %d workers", address, self.workers)
+        dispatcher = asyncio.create_task(self.dispatch())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            dispatcher.cancel()
+            self.pool.shutdown(cancel_futures=True)
+            self.responses.put(None)
+            if port is None and os.path.exists(socket_path):
+                os.remove(socket_path)
+
+
+async def open_connection(socket_path=DEFAULT_SOCKET, host=None, port=None):
+    """(reader, writer) to a running daemon, by port if one is given"""
+    if port is not None:
+        return await asyncio.open_connection(host or "127.0.0.1", port)
+    return await asyncio.open_unix_connection(socket_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve cube and N-queens solves from warm worker processes")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path")
+    parser.add_argument("--port", type=int, default=None, help="listen on localhost TCP instead of a socket")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=8, help="requests sent to a worker at once")
+    parser.add_argument("--cube-sizes", type=int, nargs="*", default=[2, 3], help="sizes whose tables are preloaded")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    daemon = SolverDaemon(args.workers, args.batch_size, args.cube_sizes)
+    try:
+        asyncio.run(daemon.serve(args.socket, port=args.port))
+    except KeyboardInterrupt:
+        pass
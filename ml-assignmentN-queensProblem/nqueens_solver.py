@@ -1,8 +1,10 @@
+import contextlib
 import time
 import random
 import math
 import psutil
 import os
+import sys
 from typing import List, Tuple, Optional
 import numpy as np
 
@@ -410,6 +412,117 @@ class OptimizedNQueensSolver:
         
         return best_individual if is_solution else None, stats
     
+    # 5. WARM START: REPAIR A NEARBY BOARD
+    def fit_board(self, board: List[int]) -> List[int]:
+        """Turn a board of any size into a permutation of size n.
+
+        Rows past n and repeated or out-of-range columns are dropped. Each
+        empty row then gets the free column on the fewest occupied diagonals,
+        so a padded smaller solution stays close to a solution.
+        """
+        n = self.n
+        fitted = [None] * n
+        used = set()
+        diag1 = [0] * (2 * n - 1)  # row - col + n - 1
+        diag2 = [0] * (2 * n - 1)  # row + col
+        for row, col in enumerate(board[:n]):
+            col = int(col)
+            if 0 <= col < n and col not in used:
+                fitted[row] = col
+                used.add(col)
+                diag1[row - col + n - 1] += 1
+                diag2[row + col] += 1
+        free = [col for col in range(n) if col not in used]
+        for row in range(n):
+            if fitted[row] is None:
+                col = min(free, key=lambda c: diag1[row - c + n - 1] + diag2[row + c])
+                free.remove(col)
+                fitted[row] = col
+                diag1[row - col + n - 1] += 1
+                diag2[row + col] += 1
+        return fitted
+
+    def solve_warm_start(self, initial_board: List[int], max_moves: int = None,
+                         noise: float = 0.1) -> Tuple[Optional[List[int]], dict]:
+        """Repair a nearby board (previous solution, perturbed board, other N) with min-conflicts swaps.
+
+        Diagonal occupancy is kept in counters, so scoring a swap is O(1)
+        instead of a conflicts_fast() pass over the board. Each move takes a
+        random attacked queen and makes its best swap, or with probability
+        `noise` a random swap when none improves. A board a few queens away
+        from a solution needs only a few moves.
+        """
+        start_time = time.time()
+        start_memory = self.get_memory_usage()
+
+        n = self.n
+        board = self.fit_board(initial_board)
+        if max_moves is None:
+            max_moves = n * 100
+        diag1 = [0] * (2 * n - 1)
+        diag2 = [0] * (2 * n - 1)
+        for row, col in enumerate(board):
+            diag1[row - col + n - 1] += 1
+            diag2[row + col] += 1
+        conflicts = sum(c * (c - 1) // 2 for c in diag1) + sum(c * (c - 1) // 2 for c in diag2)
+        initial_conflicts = conflicts
+
+        def swap(i, j):
+            # Swap the columns of rows i and j and return the change in conflicts
+            delta = 0
+            for row in (i, j):
+                col = board[row]
+                diag1[row - col + n - 1] -= 1
+                diag2[row + col] -= 1
+                delta -= diag1[row - col + n - 1] + diag2[row + col]
+            board[i], board[j] = board[j], board[i]
+            for row in (i, j):
+                col = board[row]
+                delta += diag1[row - col + n - 1] + diag2[row + col]
+                diag1[row - col + n - 1] += 1
+                diag2[row + col] += 1
+            return delta
+
+        moves = 0
+        evaluations = 0
+        while conflicts and moves < max_moves:
+            attacked = [row for row in range(n)
+                        if diag1[row - board[row] + n - 1] > 1 or diag2[row + board[row]] > 1]
+            i = random.choice(attacked)
+            best_delta = None
+            best_rows = []
+            for j in range(n):
+                if j == i:
+                    continue
+                delta = swap(i, j)
+                swap(i, j)
+                evaluations += 1
+                if best_delta is None or delta < best_delta:
+                    best_delta, best_rows = delta, [j]
+                elif delta == best_delta:
+                    best_rows.append(j)
+            if best_delta >= 0 and random.random() < noise:
+                j = random.choice([row for row in range(n) if row != i])
+            else:
+                j = random.choice(best_rows)
+            conflicts += swap(i, j)
+            moves += 1
+
+        end_time = time.time()
+        end_memory = self.get_memory_usage()
+
+        stats = {
+            'time': end_time - start_time,
+            'memory': end_memory - start_memory,
+            'moves': moves,
+            'evaluations': evaluations,
+            'initial_conflicts': initial_conflicts,
+            'final_conflicts': conflicts,
+            'success': conflicts == 0
+        }
+
+        return board if conflicts == 0 else None, stats
+
     def get_memory_usage(self) -> float:
         """Get current memory usage in MB"""
         try:
@@ -438,11 +551,37 @@ class OptimizedNQueensSolver:
             print(f"Board representation: {board[:10]}..." if self.n > 10 else f"Board: {board}")
         print()
 
-def run_optimized_analysis():
-    """Run optimized analysis with DFS for all N values"""
+# Evaluation functions whose share of each run is reported when profiling
+PROFILE_HOT = {
+    'conflicts_fast': ('conflicts_fast',),
+    'is_safe_fast': ('is_safe_fast',),
+    'ga fitness': ('fitness',),
+}
+
+def run_optimized_analysis(profile_dir: str = None):
+    """Run optimized analysis with DFS for all N values
+
+    With profile_dir every algorithm run is profiled with the Profiler from
+    the repository's shared profiling.py (self/cumulative reports, collapsed
+    stacks, and the share of time in conflicts_fast / is_safe_fast).
+    """
     problem_sizes = [10, 30, 50, 100, 200]
     
     results = []
+    profiler = None
+    if profile_dir is not None:
+        sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from profiling import Profiler, format_shares
+        profiler = Profiler(profile_dir, PROFILE_HOT)
+    
+    def profiled(label):
+        return profiler.profile(f"N{n}-{label}") if profiler is not None else contextlib.nullcontext()
+    
+    def add_result(label, row):
+        if profiler is not None:
+            row['Profile'] = profiler.shares(f"N{n}-{label}")
+            print(f"  Profile: {format_shares(row['Profile'])}")
+        results.append(row)
     
     print("OPTIMIZED N-Queens Problem Analysis")
     print("=" * 50)
@@ -458,9 +597,10 @@ def run_optimized_analysis():
         try:
             # Set timeout based on problem size
             timeout = 60 if n <= 30 else 300 if n <= 100 else 600  # 1min, 5min, 10min
-            solution, stats = solver.solve_exhaustive_dfs(timeout_seconds=timeout)
+            with profiled('DFS'):
+                solution, stats = solver.solve_exhaustive_dfs(timeout_seconds=timeout)
             
-            results.append({
+            add_result('DFS', {
                 'N': n, 'Algorithm': 'DFS', 'Time': stats['time'], 
                 'Memory': stats['memory'], 'Success': stats['success'],
                 'Nodes': stats['nodes_explored'], 'Timeout': stats['timeout']
@@ -475,8 +615,9 @@ def run_optimized_analysis():
         
         # 2. Hill Climbing with Restarts
         print("Running Hill Climbing...")
-        solution, stats = solver.solve_greedy_hill_climbing()
-        results.append({
+        with profiled('Hill Climbing'):
+            solution, stats = solver.solve_greedy_hill_climbing()
+        add_result('Hill Climbing', {
             'N': n, 'Algorithm': 'Hill Climbing', 'Time': stats['time'], 
             'Memory': stats['memory'], 'Success': stats['success']
         })
@@ -484,8 +625,9 @@ def run_optimized_analysis():
         
         # 3. Simulated Annealing
         print("Running Simulated Annealing...")
-        solution, stats = solver.solve_simulated_annealing()
-        results.append({
+        with profiled('Simulated Annealing'):
+            solution, stats = solver.solve_simulated_annealing()
+        add_result('Simulated Annealing', {
             'N': n, 'Algorithm': 'Simulated Annealing', 'Time': stats['time'], 
             'Memory': stats['memory'], 'Success': stats['success']
         })
@@ -493,13 +635,16 @@ def run_optimized_analysis():
         
         # 4. Genetic Algorithm
         print("Running Genetic Algorithm...")
-        solution, stats = solver.solve_genetic_algorithm()
-        results.append({
+        with profiled('Genetic Algorithm'):
+            solution, stats = solver.solve_genetic_algorithm()
+        add_result('Genetic Algorithm', {
             'N': n, 'Algorithm': 'Genetic Algorithm', 'Time': stats['time'], 
             'Memory': stats['memory'], 'Success': stats['success']
         })
         print(f"  Genetic Algorithm: {'✓' if stats['success'] else '✗'} - {stats['time']:.4f}s")
     
+    if profiler is not None:
+        print(f"\nProfiles written to {profiler.write_summary()}")
     return results
 
 def print_summary(results):
@@ -546,12 +691,30 @@ def quick_test():
         ("Genetic Algorithm", solver.solve_genetic_algorithm)
     ]
     
+    known_solution = None
     for name, method in algorithms:
         solution, stats = method()
         timeout_msg = " (TIMEOUT)" if stats.get('timeout', False) else ""
         print(f"{name}: {'✓' if stats['success'] else '✗'} - {stats['time']:.4f}s{timeout_msg}")
         if solution and stats['success']:
             print(f"  Conflicts: {solver.conflicts_fast(solution)}")
+            known_solution = known_solution or solution
+
+    if known_solution is None:
+        print("Warm start: skipped, no algorithm found a solution to start from")
+        return
+
+    # Warm start: swap two queens of a solution so it has conflicts, then grow it to N=10
+    board = known_solution[:]
+    for j in range(1, len(board)):
+        board[0], board[j] = board[j], board[0]
+        if solver.conflicts_fast(board):
+            break
+        board[0], board[j] = board[j], board[0]
+    for name, target in (("perturbed", solver), ("N=10", OptimizedNQueensSolver(10))):
+        repaired, stats = target.solve_warm_start(board)
+        print(f"Warm start ({name}): {'✓' if stats['success'] else '✗'} - {stats['time']:.4f}s - "
+              f"{stats['moves']} moves from {stats['initial_conflicts']} conflicts")
 
 if __name__ == "__main__":
     print("Optimized N-Queens Solver")
@@ -562,7 +725,8 @@ if __name__ == "__main__":
         if choice == "1":
             quick_test()
         else:
-            results = run_optimized_analysis()
+            # python nqueens_solver.py --profile also writes per-run profiles
+            results = run_optimized_analysis("results/profiles" if "--profile" in sys.argv else None)
             print_summary(results)
     except KeyboardInterrupt:
         print("\nAnalysis interrupted by user")
@@ -0,0 +1,162 @@
+"""Opt-in profiling of individual solver runs, shared by the cube and N-queens code.
+
+Each run wrapped in Profiler.profile(label) is measured two ways:
+
+- cProfile, for exact per-function self (tottime) and cumulative time. The
+  report is written to <label>.txt and the raw stats to <label>.prof, which
+  snakeviz or pstats can open.
+- A CPU-time stack sampler (SIGPROF every `sample_interval` seconds), for
+  whole call stacks. They are written in collapsed form to <label>.collapsed,
+  ready for flamegraph.pl or speedscope. Platforms without setitimer skip this.
+
+`hot` groups the evaluation functions whose share of the run time should be
+reported, e.g. {'conflicts': ('conflicts_fast',)}. An entry is a function
+name or 'file.py:name'. Shares use cumulative time, so a group should list
+outermost functions only; a listed function that calls another listed
+function would be counted twice.
+
+cProfile slows call-heavy loops down considerably, so read profiled times
+for proportions, not as benchmark numbers (see benchmark.py for those).
+"""
+import contextlib
+import cProfile
+import os
+import pstats
+import signal
+import time
+from collections import Counter
+
+REPORT_LINES = 25
+
+
+def frame_label(code):
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class StackSampler:
+    """Counts collapsed call stacks of the main thread on a CPU-time timer"""
+
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.stacks = Counter()
+        self.previous = None
+
+    def _sample(self, signum, frame):
+        labels = []
+        while frame is not None:
+            labels.append(frame_label(frame.f_code))
+            frame = frame.f_back
+        self.stacks[";".join(reversed(labels))] += 1
+
+    def start(self):
+        if not hasattr(signal, "setitimer"):
+            return False
+        self.previous = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        return True
+
+    def stop(self):
+        if self.previous is not None:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, self.previous)
+            self.previous = None
+
+    def write(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def _matches(entry, function):
+    filename, _, name = function
+    if ":" in entry:
+        file_part, name_part = entry.split(":", 1)
+        return name == name_part and os.path.basename(filename) == file_part
+    return name == entry
+
+
+def hot_shares(stats, hot, total_time):
+    """Share of total_time spent in each group of `hot`, from cumulative times"""
+    shares = {}
+    for group, entries in hot.items():
+        cumulative = sum(row[3] for function, row in stats.stats.items()
+                         if any(_matches(entry, function) for entry in entries))
+        shares[group] = cumulative / total_time if total_time > 0 else 0.0
+    return shares
+
+
+class Profiler:
+    """Profiles labelled runs and writes one report per run plus a summary"""
+
+    def __init__(self, output_dir="results/profiles", hot=None, sample_interval=0.001, stacks=True):
+        self.output_dir = output_dir
+        self.hot = hot or {}
+        self.sample_interval = sample_interval
+        self.stacks = stacks
+        self.runs = {}
+        self.combined = None
+        os.makedirs(output_dir, exist_ok=True)
+
+    def path(self, label, extension):
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in label)
+        return os.path.join(self.output_dir, f"{safe}{extension}")
+
+    @contextlib.contextmanager
+    def profile(self, label):
+        """Profile the body of the with-block as one run"""
+        profiler = cProfile.Profile()
+        sampler = StackSampler(self.sample_interval)
+        sampling = self.stacks and sampler.start()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - start
+            sampler.stop()
+            self._record(label, profiler, sampler if sampling else None, elapsed)
+
+    def _record(self, label, profiler, sampler, elapsed):
+        stats = pstats.Stats(profiler)
+        if self.combined is None:
+            self.combined = pstats.Stats(profiler)
+        else:
+            self.combined.add(profiler)
+        stats.dump_stats(self.path(label, ".prof"))
+        with open(self.path(label, ".txt"), "w") as f:
+            stats.stream = f
+            f.write(f"{label}: {elapsed:.3f}s wall, {stats.total_tt:.3f}s profiled\n\n")
+            stats.sort_stats("tottime").print_stats(REPORT_LINES)
+            stats.sort_stats("cumulative").print_stats(REPORT_LINES)
+        if sampler is not None:
+            sampler.write(self.path(label, ".collapsed"))
+        self.runs[label] = {
+            'time': elapsed,
+            'samples': sum(sampler.stacks.values()) if sampler is not None else 0,
+            'shares': hot_shares(stats, self.hot, stats.total_tt),
+        }
+        return self.runs[label]
+
+    def shares(self, label):
+        return self.runs[label]['shares']
+
+    def write_summary(self):
+        """Shares per run and the top functions over all runs, in summary.txt"""
+        path = os.path.join(self.output_dir, "summary.txt")
+        with open(path, "w") as f:
+            groups = list(self.hot)
+            f.write(f"{'Run':40} {'Time (s)':>10} " + " ".join(f"{group[:14]:>14}" for group in groups) + "\n")
+            for label, run in self.runs.items():
+                f.write(f"{label[:40]:40} {run['time']:>10.3f} " +
+                        " ".join(f"{run['shares'][group]:>14.1%}" for group in groups) + "\n")
+            if self.combined is not None:
+                f.write("\nAll runs combined\n")
+                self.combined.stream = f
+                self.combined.sort_stats("tottime").print_stats(REPORT_LINES)
+        return path
+
+
+def format_shares(shares):
+    return ", ".join(f"{group} {share:.0%}" for group, share in shares.items())